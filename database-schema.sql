@@ -98,10 +98,31 @@ CREATE TABLE IF NOT EXISTS video_jobs (
     prompt TEXT,
     metadata JSONB,
     error TEXT,
+    progress INTEGER DEFAULT 0,
+    cost INTEGER,                                -- Crédits débités à la création (remboursés en cas d'échec)
+    size_bytes BIGINT,                           -- Taille de la vidéo finale (HEAD /stream sans lire Storage)
+    youtube_upload JSONB,                        -- État de l'upload YouTube en arrière-plan (status, youtube_url, error...)
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     completed_at TIMESTAMP WITH TIME ZONE
 );
 
+-- Add new columns to existing video_jobs table (run if table already exists)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'video_jobs' AND column_name = 'progress') THEN
+        ALTER TABLE video_jobs ADD COLUMN progress INTEGER DEFAULT 0;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'video_jobs' AND column_name = 'cost') THEN
+        ALTER TABLE video_jobs ADD COLUMN cost INTEGER;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'video_jobs' AND column_name = 'size_bytes') THEN
+        ALTER TABLE video_jobs ADD COLUMN size_bytes BIGINT;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'video_jobs' AND column_name = 'youtube_upload') THEN
+        ALTER TABLE video_jobs ADD COLUMN youtube_upload JSONB;
+    END IF;
+END $$;
+
 -- ============================================
 -- TABLE: credit_transactions (optionnel - pour historique)
 -- ============================================
@@ -143,7 +164,9 @@ CREATE TABLE IF NOT EXISTS notifications (
 -- ============================================
 -- INDEXES pour performance
 -- ============================================
-CREATE INDEX IF NOT EXISTS idx_video_jobs_user_id ON video_jobs(user_id);
+-- Listing d'un utilisateur (WHERE user_id ORDER BY created_at DESC LIMIT/OFFSET) ; couvre aussi les filtres user_id seuls
+CREATE INDEX IF NOT EXISTS idx_video_jobs_user_created ON video_jobs(user_id, created_at DESC);
+DROP INDEX IF EXISTS idx_video_jobs_user_id;
 CREATE INDEX IF NOT EXISTS idx_video_jobs_status ON video_jobs(status);
 CREATE INDEX IF NOT EXISTS idx_video_jobs_created_at ON video_jobs(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_profiles_stripe_subscription ON profiles(stripe_subscription_id);
@@ -265,6 +288,59 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
+-- ============================================
+-- FUNCTION: ensure_profile
+-- Retourne le profil, en le créant (plan free, 10 crédits) s'il n'existe pas.
+-- Un seul appel depuis l'API au lieu de select + insert. Réservée au service role.
+-- ============================================
+CREATE OR REPLACE FUNCTION ensure_profile(p_user_id UUID)
+RETURNS profiles AS $$
+DECLARE
+    result profiles;
+BEGIN
+    INSERT INTO profiles (id, email, credits, plan)
+    VALUES (p_user_id, p_user_id || '@vykso.com', 10, 'free')
+    ON CONFLICT (id) DO NOTHING;
+    
+    SELECT * INTO result FROM profiles WHERE id = p_user_id;
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION ensure_profile(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION ensure_profile(UUID) TO service_role;
+
+-- ============================================
+-- FUNCTION: reserve_credits
+-- Vérifie et débite les crédits en une seule requête atomique.
+-- Retourne le solde restant, ou NULL si crédits insuffisants. Réservée au service role.
+-- ============================================
+CREATE OR REPLACE FUNCTION reserve_credits(p_user_id UUID, p_amount INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    current_credits INTEGER;
+BEGIN
+    UPDATE profiles 
+    SET credits = credits - p_amount,
+        updated_at = NOW()
+    WHERE id = p_user_id
+      AND credits >= p_amount
+    RETURNING credits INTO current_credits;
+    
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+    
+    INSERT INTO credit_transactions (user_id, amount, type, description)
+    VALUES (p_user_id, -p_amount, 'debit', 'Video generation');
+    
+    RETURN current_credits;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION reserve_credits(UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reserve_credits(UUID, INTEGER) TO service_role;
+
 -- ============================================
 -- FUNCTION: refund_credits
 -- ============================================
@@ -287,6 +363,50 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
+-- ============================================
+-- FUNCTION: fail_video_job
+-- Passe le job en 'failed' et rembourse ses crédits en un seul appel.
+-- Le montant et l'utilisateur sont lus sur le job (colonne cost), pas recalculés par l'API.
+-- Le remboursement n'a lieu qu'une fois, même si la fonction est rappelée.
+-- Seul un job encore en cours (pending/generating) peut échouer : un job 'completed'
+-- n'est jamais remboursé. Réservée au service role (pas d'EXECUTE pour anon/authenticated).
+-- ============================================
+DROP FUNCTION IF EXISTS fail_video_job(UUID, UUID, INTEGER, TEXT);
+
+CREATE OR REPLACE FUNCTION fail_video_job(p_job_id UUID, p_error TEXT)
+RETURNS INTEGER AS $$
+DECLARE
+    job_user_id UUID;
+    job_cost INTEGER;
+    current_credits INTEGER;
+BEGIN
+    UPDATE video_jobs
+    SET status = 'failed',
+        error = p_error
+    WHERE id = p_job_id
+      AND status IN ('pending', 'generating')
+    RETURNING user_id, COALESCE(cost, 0) INTO job_user_id, job_cost;
+    
+    IF NOT FOUND OR job_cost <= 0 THEN
+        RETURN NULL;
+    END IF;
+    
+    UPDATE profiles 
+    SET credits = credits + job_cost,
+        updated_at = NOW()
+    WHERE id = job_user_id
+    RETURNING credits INTO current_credits;
+    
+    INSERT INTO credit_transactions (user_id, amount, type, description)
+    VALUES (job_user_id, job_cost, 'refund', 'Video generation refund');
+    
+    RETURN current_credits;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION fail_video_job(UUID, TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION fail_video_job(UUID, TEXT) TO service_role;
+
 -- ============================================
 -- FUNCTION: add_credits (pour achats et abonnements)
 -- ============================================
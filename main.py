@@ -1,18 +1,27 @@
 import os
-import json
+import re
+import asyncio
 import uuid
 import stripe
 import httpx
+import orjson
 import logging
+import logging.handlers
+import atexit
+import queue
+import time
+import hashlib
+import jwt
+import tempfile
 from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Literal
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
-from pydantic import BaseModel, field_validator
+from fastapi.responses import Response, ORJSONResponse, RedirectResponse
+from pydantic import BaseModel, TypeAdapter, field_validator
 from sora_client import SoraClient
 from veo_client import VeoAIClient
-from supabase_client import get_client
+from supabase_client import POSTGREST_TIMEOUT, get_client
 from utils.supabase_uploader import SupabaseVideoUploader
 from utils.video_concat import VideoEditor
 from utils.content_generator import ContentGenerator, ScheduleCalculator
@@ -21,7 +30,18 @@ from youtube_client import YouTubeClient
 from io import BytesIO
 from starlette.requests import Request as StarletteRequest
 from starlette.responses import StreamingResponse as StarletteStreamingResponse
+from starlette.background import BackgroundTask
 from urllib.parse import urlparse
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from cachetools import TLRUCache, TTLCache
+
+try:
+    from openai import APITimeoutError as _OpenAITimeoutError
+except ImportError:  # sora_client then talks to the API over plain httpx
+    _OpenAITimeoutError = httpx.TimeoutException
 
 # ========= LOGGING FILTER FOR 401 ERRORS =========
 # Filter out 401 Unauthorized from uvicorn access logs to reduce noise
@@ -39,32 +59,90 @@ class Filter401Responses(logging.Filter):
 uvicorn_access_logger = logging.getLogger("uvicorn.access")
 uvicorn_access_logger.addFilter(Filter401Responses())
 
+# ========= APP LOGGER =========
+# Records are handed to a queue and written to stdout by a listener thread,
+# so request handlers and background jobs never block on the stream write.
+logger = logging.getLogger("vykso")
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+# LOG_LEVEL=WARNING in production drops the per-step progress messages (formatting is lazy)
+_log_level_name = os.getenv("LOG_LEVEL", "INFO").upper()
+_log_level = logging.getLevelName(_log_level_name)
+logger.setLevel(_log_level if isinstance(_log_level, int) else logging.INFO)
+logger.propagate = False
+_log_listener.start()
+atexit.register(_log_listener.stop)
+if not isinstance(_log_level, int):
+    logger.warning("⚠️ Unknown LOG_LEVEL %r, using INFO", _log_level_name)
+
 # Import new Stripe configuration and routes
 from config.stripe_config import get_stripe_config, get_plan_type
 from routes.checkout import router as checkout_router
+# Checkout redirect URLs: defined once in routes/checkout.py for both checkout paths
+from routes.checkout import (
+    CHECKOUT_SUCCESS_URL,
+    CHECKOUT_CANCEL_PRICING_URL,
+    CHECKOUT_CANCEL_CREDITS_URL,
+)
 from routes.webhook import router as webhook_router
 from services.supabase_service import (
     update_user_subscription,
     add_credits_to_user,
     get_user_by_stripe_subscription,
+    get_cached_profile,
+    cache_profile,
+    invalidate_profile,
 )
 
 app = FastAPI(
     title="Vykso API",
     description="API de génération vidéo automatique via Sora 2",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+class UploadSizeLimitMiddleware:
+    """Reject image uploads whose declared Content-Length is already over the limit,
+    before the multipart body is received and parsed.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] == "/api/upload-image":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > MAX_IMAGE_UPLOAD_REQUEST_SIZE:
+                        response = ORJSONResponse(
+                            status_code=413,
+                            content={"detail": f"File too large. Max size: {MAX_IMAGE_UPLOAD_SIZE / 1024 / 1024}MB"},
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
+# Built once, without the empty entry an unset FRONTEND_URL used to add; a frozenset
+# makes Starlette's per-request `origin in allow_origins` check O(1)
+ALLOWED_ORIGINS = frozenset(
+    origin for origin in (
         "http://localhost:3000",
         "https://vykso.com",
         "https://vykso.lovable.app",
         "https://www.vykso.com",
-        os.getenv("FRONTEND_URL", ""),
-    ],
+        os.getenv("FRONTEND_URL", "").rstrip("/"),
+    ) if origin
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -145,17 +223,163 @@ def get_schedule_calculator():
 
 # Stripe
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+
+# Image uploads
+ALLOWED_IMAGE_TYPES: frozenset = frozenset({"image/jpeg", "image/png", "image/webp"})
+ALLOWED_IMAGE_TYPES_JOINED = ", ".join(sorted(ALLOWED_IMAGE_TYPES))
+ALLOWED_IMAGE_EXTENSIONS: frozenset = frozenset({"jpg", "jpeg", "png", "webp"})
+MAX_IMAGE_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+# Whole multipart request: the file plus boundaries/part headers
+MAX_IMAGE_UPLOAD_REQUEST_SIZE = MAX_IMAGE_UPLOAD_SIZE + 64 * 1024
 
 # ========= VIDEO STREAMING/PROXY HELPERS =========
 SUPABASE_URL = os.getenv("SUPABASE_URL", "").rstrip("/")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 VIDEOS_BUCKET = os.getenv("VIDEOS_BUCKET", "vykso-videos")
+# Owner-only content (auth required): browsers may cache it, shared caches must not
+VIDEO_CACHE_CONTROL = "private, max-age=3600"
+# Pre-encoded bodies for the hot 404 paths of stream/download (ID probing, unfinished jobs)
+_VIDEO_NOT_FOUND_BODY = orjson.dumps({"detail": "Video not found"})
+_VIDEO_URL_UNAVAILABLE_BODY = orjson.dumps({"detail": "Video URL not available"})
+# Opt-in: /stream redirects the player to a short-lived signed Storage URL instead of proxying bytes
+STREAM_SIGNED_REDIRECT = os.getenv("STREAM_SIGNED_REDIRECT", "false").lower() in ("1", "true", "yes")
+STREAM_SIGNED_URL_TTL = int(os.getenv("STREAM_SIGNED_URL_TTL", "3600"))
+# A cached signed URL is reused (and the redirect cached) only until shortly before it expires
+_STREAM_SIGNED_URL_MARGIN = min(60, STREAM_SIGNED_URL_TTL // 2)
 SUPABASE_ANON_OR_SERVICE_KEY = os.getenv("SUPABASE_ANON_KEY") or os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
+# PostgREST auth headers for the service role, built once
+_SUPABASE_REST_HEADERS = {
+    "apikey": SUPABASE_SERVICE_KEY or "",
+    "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
+    "Accept": "application/json",
+}
+
+# Shared async HTTP client for Supabase proxying (keep-alive pool reused across requests)
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=10.0, read=None, write=30.0, pool=10.0),
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=300),
+            # Concurrent range requests multiplex over one TLS connection (HTTP/1.1 fallback kept)
+            http1=True,
+            http2=True,
+        )
+    return _http_client
+
+@app.on_event("shutdown")
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# ========= AUTH (local JWT verification) =========
+# Asymmetric Supabase signing keys are fetched once from the JWKS endpoint and
+# tokens are verified in-process; verified tokens are remembered briefly so
+# repeated requests (polling, range requests) skip even the signature check.
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+# Tokens carry the project-ref issuer: set it explicitly when SUPABASE_URL is a custom domain
+SUPABASE_JWT_ISSUER = os.getenv("SUPABASE_JWT_ISSUER") or f"{SUPABASE_URL}/auth/v1"
+_jwt_issuer_mismatch_logged = False
+_JWKS_REFETCH_MIN_INTERVAL = 30.0
+_jwks_cache: TTLCache = TTLCache(maxsize=1, ttl=600)
+_jwks_fetched_at = 0.0
+_TOKEN_CACHE_TTL = 30.0
+# Entries live 30s at most and never past the token's own exp (wall-clock timer)
+_token_cache: TLRUCache = TLRUCache(
+    maxsize=10_000,
+    ttu=lambda _key, value, now: min(now + _TOKEN_CACHE_TTL, value[1] or now + _TOKEN_CACHE_TTL),
+    timer=time.time,
+)
+
+async def _get_jwks(force: bool = False) -> Dict[str, jwt.PyJWK]:
+    """Return the project's signing keys by kid (cached for 10 min, refetched on unknown kid)."""
+    global _jwks_fetched_at
+    keys = _jwks_cache.get("keys")
+    now = time.monotonic()
+    if keys is not None and not (force and now - _jwks_fetched_at > _JWKS_REFETCH_MIN_INTERVAL):
+        return keys
+    # Bounded read: the shared client has no read timeout and every auth waits on this
+    resp = await get_http_client().get(f"{SUPABASE_JWT_ISSUER}/.well-known/jwks.json", timeout=10)
+    resp.raise_for_status()
+    keys = {}
+    for jwk in orjson.loads(resp.content).get("keys", []):
+        try:
+            keys[jwk.get("kid")] = jwt.PyJWK(jwk)
+        except jwt.PyJWTError:
+            continue  # unsupported key type
+    _jwks_cache["keys"] = keys
+    _jwks_fetched_at = now
+    return keys
+
+async def _verify_jwt_locally(jwt_token: str) -> Optional[dict]:
+    """Verify the token in-process and return its claims.
+    Returns None when it can't be checked locally (HS256 without SUPABASE_JWT_SECRET,
+    JWKS unavailable): the caller then asks Supabase Auth.
+    """
+    try:
+        header = jwt.get_unverified_header(jwt_token)
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    alg = header.get("alg")
+    if alg == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            return None
+        key = SUPABASE_JWT_SECRET
+    elif alg in ("RS256", "ES256"):
+        kid = header.get("kid")
+        try:
+            keys = await _get_jwks()
+            if kid not in keys:
+                # Key rotation: refetch once
+                keys = await _get_jwks(force=True)
+        except (httpx.HTTPError, ValueError):
+            return None
+        if kid not in keys:
+            return None
+        key = keys[kid].key  # PyJWK objects are only accepted by decode() from PyJWT 2.10
+    else:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    try:
+        claims = jwt.decode(
+            jwt_token,
+            key,
+            algorithms=[alg],
+            audience="authenticated",
+            issuer=SUPABASE_JWT_ISSUER,
+        )
+    except jwt.InvalidIssuerError:
+        # Signature is fine but iss differs (custom domain): let Supabase Auth decide, and say why once
+        global _jwt_issuer_mismatch_logged
+        if not _jwt_issuer_mismatch_logged:
+            _jwt_issuer_mismatch_logged = True
+            logger.warning("⚠️ JWT issuer differs from %s, verifying tokens via Supabase Auth instead: set SUPABASE_JWT_ISSUER", SUPABASE_JWT_ISSUER)
+        return None
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return claims
+
+def _token_exp(jwt_token: str) -> Optional[float]:
+    """exp claim of a token already validated elsewhere (None when absent/unreadable)."""
+    try:
+        exp = jwt.decode(jwt_token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
 async def _get_authenticated_user_id(request: Request) -> str:
     """Validate Supabase JWT from Authorization header and return user id (sub).
 
-    This calls Supabase Auth `/auth/v1/user` which verifies the Bearer JWT.
+    The JWT is verified locally (JWKS or SUPABASE_JWT_SECRET); when that isn't
+    possible this falls back to Supabase Auth `/auth/v1/user`.
     Requires SUPABASE_URL and an API key (anon or service) in env.
     """
     auth_header = request.headers.get("Authorization", "")
@@ -166,15 +390,28 @@ async def _get_authenticated_user_id(request: Request) -> str:
     if not SUPABASE_URL or not SUPABASE_ANON_OR_SERVICE_KEY:
         raise HTTPException(status_code=500, detail="Supabase auth not configured")
 
+    token_key = hashlib.sha256(jwt_token.encode()).hexdigest()
+    cached = _token_cache.get(token_key)
+    if cached is not None:
+        return cached[0]
+
+    claims = await _verify_jwt_locally(jwt_token)
+    user_id = claims.get("sub") if claims else None
+    if user_id:
+        exp = claims.get("exp")
+        _token_cache[token_key] = (user_id, float(exp) if isinstance(exp, (int, float)) else None)
+        return user_id
+
     auth_user_url = f"{SUPABASE_URL}/auth/v1/user"
-    async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.get(
-            auth_user_url,
-            headers={
-                "Authorization": f"Bearer {jwt_token}",
-                "apikey": SUPABASE_ANON_OR_SERVICE_KEY,
-            },
-        )
+    # Shared pooled client (kept-alive TLS/HTTP2 connection), bounded read for this call
+    resp = await get_http_client().get(
+        auth_user_url,
+        headers={
+            "Authorization": f"Bearer {jwt_token}",
+            "apikey": SUPABASE_ANON_OR_SERVICE_KEY,
+        },
+        timeout=10,
+    )
     if resp.status_code != 200:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     try:
@@ -184,30 +421,180 @@ async def _get_authenticated_user_id(request: Request) -> str:
         user_id = None
     if not user_id:
         raise HTTPException(status_code=401, detail="Unable to resolve user from token")
+    _token_cache[token_key] = (user_id, _token_exp(jwt_token))
     return user_id
 
+# Compiled once for the videos bucket: .../storage/v1/object/[public/]{bucket}/{path}[?query]
+_VIDEO_OBJECT_PATH_RE = re.compile(rf"/storage/v1/object/(?:public/)?{re.escape(VIDEOS_BUCKET)}/([^?#]+)")
+
+@lru_cache(maxsize=10_000)
 def _extract_object_path_from_public_url(public_url: str, bucket: str) -> Optional[str]:
     """Extract the storage object path (filename) from a Supabase public URL.
     Supports URLs like .../storage/v1/object/public/{bucket}/{path}.
     """
-    try:
-        parts = public_url.split("/storage/v1/object/")
-        if len(parts) < 2:
-            return None
-        tail = parts[1]
-        # remove leading 'public/' if present
-        if tail.startswith("public/"):
-            tail = tail[len("public/"):]
-        # tail is now like '{bucket}/{path}'
-        if not tail.startswith(f"{bucket}/"):
-            return None
-        return tail[len(bucket) + 1 :]
-    except Exception:
+    if bucket == VIDEOS_BUCKET:
+        pattern = _VIDEO_OBJECT_PATH_RE
+    else:
+        pattern = re.compile(rf"/storage/v1/object/(?:public/)?{re.escape(bucket)}/([^?#]+)")
+    match = pattern.search(public_url)
+    return match.group(1) if match else None
+
+# Completed jobs' (video_url, niche, created_at, user_id, size_bytes) plus the derived object path
+# and download filename prefix, reused by stream/download
+# so repeated range requests for the same video skip the database round-trip
+_job_meta_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+# Background warm-up of that cache with recent jobs (0 disables it)
+JOB_META_PREFETCH_INTERVAL = int(os.getenv("JOB_META_PREFETCH_INTERVAL", "60"))
+JOB_META_PREFETCH_LIMIT = 1000
+
+async def _get_job_meta(job_id: str) -> Optional[dict]:
+    """Return the job fields needed to serve its video, or None if the job doesn't exist
+    (PostgREST 4xx, e.g. a malformed job id, counts as not found).
+    Only rows that already have a video_url are cached: earlier rows are still changing.
+    """
+    meta = _job_meta_cache.get(job_id)
+    if meta is not None:
+        return meta
+
+    # Direct PostgREST call on the shared async client with prebuilt headers:
+    # no worker thread and no supabase-py request building on this hot path
+    resp = await get_http_client().get(
+        f"{SUPABASE_URL}/rest/v1/video_jobs",
+        params={"id": f"eq.{job_id}", "select": "video_url,niche,created_at,user_id,size_bytes", "limit": "1"},
+        headers=_SUPABASE_REST_HEADERS,
+        # Same bound as the supabase-py PostgREST client (the shared client has no read timeout)
+        timeout=POSTGREST_TIMEOUT,
+    )
+    if 400 <= resp.status_code < 500:
+        return None
+    resp.raise_for_status()
+    rows = orjson.loads(resp.content)
+    if not rows:
         return None
 
-async def _proxy_supabase_object_stream(object_path: str, range_header: Optional[str]):
+    meta = rows[0]
+    if meta.get("video_url"):
+        _cache_job_meta(job_id, meta)
+    return meta
+
+def _cache_job_meta(job_id: str, meta: dict) -> None:
+    """Precompute what the endpoints derive per request (object path + download filename) and cache."""
+    video_url = meta["video_url"]
+    meta["object_path"] = (
+        _extract_object_path_from_public_url(video_url, VIDEOS_BUCKET)
+        or video_url.rstrip("/").split("/")[-1]
+    )
+    meta["filename_prefix"] = f"vykso_{meta.get('niche', 'video')}_{(meta.get('created_at') or '')[:10]}_{job_id[:8]}"
+    _job_meta_cache[job_id] = meta
+
+async def _prefetch_recent_job_meta() -> None:
+    """Periodically load the last 24h of finished jobs into the job meta cache,
+    so stream/download of recent videos never wait on the database.
+    """
+    while True:
+        try:
+            since = (datetime.now(timezone.utc) - timedelta(hours=24)).isoformat()
+            resp = await get_http_client().get(
+                f"{SUPABASE_URL}/rest/v1/video_jobs",
+                params={
+                    "select": "id,video_url,niche,created_at,user_id,size_bytes",
+                    "created_at": f"gte.{since}",
+                    "video_url": "not.is.null",
+                    "order": "created_at.desc",
+                    "limit": str(JOB_META_PREFETCH_LIMIT),
+                },
+                headers=_SUPABASE_REST_HEADERS,
+                # A hung call would otherwise stall this loop for the life of the process
+                timeout=POSTGREST_TIMEOUT,
+            )
+            resp.raise_for_status()
+            for row in orjson.loads(resp.content):
+                job_id = row.pop("id")
+                # Keep live entries as-is (they may carry a signed URL already)
+                if job_id not in _job_meta_cache:
+                    _cache_job_meta(job_id, row)
+        except Exception as e:
+            logger.warning("⚠️ Job meta prefetch failed: %s", e)
+        await asyncio.sleep(JOB_META_PREFETCH_INTERVAL)
+
+_job_meta_prefetch_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def check_required_settings():
+    """Report missing configuration once at boot instead of as 500s on the first requests."""
+    required = {
+        "SUPABASE_URL": SUPABASE_URL,
+        "SUPABASE_SERVICE_KEY / SUPABASE_SERVICE_ROLE_KEY": SUPABASE_SERVICE_KEY,
+        "STRIPE_SECRET_KEY": stripe.api_key,
+        "STRIPE_WEBHOOK_SECRET": STRIPE_WEBHOOK_SECRET,
+    }
+    missing = [name for name, value in required.items() if not value]
+    if missing:
+        logger.warning("⚠️ Missing configuration: %s (dependent endpoints will fail)", ", ".join(missing))
+
+@app.on_event("startup")
+async def start_job_meta_prefetch():
+    global _job_meta_prefetch_task
+    if JOB_META_PREFETCH_INTERVAL > 0 and SUPABASE_URL and SUPABASE_SERVICE_KEY:
+        _job_meta_prefetch_task = asyncio.create_task(_prefetch_recent_job_meta())
+
+@app.on_event("shutdown")
+async def stop_job_meta_prefetch():
+    global _job_meta_prefetch_task
+    if _job_meta_prefetch_task is not None:
+        _job_meta_prefetch_task.cancel()
+        _job_meta_prefetch_task = None
+
+async def _create_signed_video_url(object_path: str) -> str:
+    """Create a time-limited signed URL for a videos bucket object (Storage REST, shared client)."""
+    try:
+        resp = await get_http_client().post(
+            f"{SUPABASE_URL}/storage/v1/object/sign/{VIDEOS_BUCKET}/{object_path}",
+            json={"expiresIn": STREAM_SIGNED_URL_TTL},
+            headers=_SUPABASE_REST_HEADERS,
+            # Bounded: the shared client has no read timeout and /stream waits on this
+            timeout=POSTGREST_TIMEOUT,
+        )
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="Timed out signing video URL")
+    if resp.status_code >= 400:
+        raise HTTPException(status_code=resp.status_code, detail="Unable to sign video URL")
+    # signedURL is relative to the storage API root: /object/sign/{bucket}/{path}?token=...
+    return f"{SUPABASE_URL}/storage/v1{orjson.loads(resp.content)['signedURL']}"
+
+async def _signed_stream_redirect(job_meta: dict) -> RedirectResponse:
+    """302 to the job's signed Storage URL (GET and HEAD /stream in STREAM_SIGNED_REDIRECT mode).
+    The URL is kept on the job meta cache entry with its own deadline
+    (STREAM_SIGNED_URL_TTL may be below the meta TTL).
+    """
+    now = time.monotonic()
+    signed_url = job_meta.get("signed_url")
+    if not signed_url or job_meta.get("signed_url_valid_until", 0) <= now:
+        signed_url = await _create_signed_video_url(job_meta["object_path"])
+        job_meta["signed_url"] = signed_url
+        job_meta["signed_url_valid_until"] = now + STREAM_SIGNED_URL_TTL - _STREAM_SIGNED_URL_MARGIN
+    max_age = min(300, int(job_meta["signed_url_valid_until"] - now))
+    return RedirectResponse(signed_url, status_code=302, headers={"Cache-Control": f"private, max-age={max_age}"})
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+async def _download_to_file(url: str, dest_path: str, headers: Optional[dict] = None, timeout: float = 60):
+    """Stream a remote file to disk chunk by chunk over the shared client (never holds the whole body in memory)."""
+    async with get_http_client().stream("GET", url, headers=headers, timeout=timeout) as r:
+        r.raise_for_status()
+        with open(dest_path, "wb") as f:
+            async for chunk in r.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+
+async def _proxy_supabase_object_stream(
+    object_path: str,
+    range_header: Optional[str],
+    if_none_match: Optional[str] = None,
+    if_modified_since: Optional[str] = None,
+):
     """Stream a Supabase Storage object with Range support using the service key.
     This avoids exposing external URLs and works with private buckets.
+    Conditional request headers are forwarded so revalidations get a bodiless 304.
     """
     if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
         raise HTTPException(status_code=500, detail="Supabase configuration missing")
@@ -221,35 +608,63 @@ async def _proxy_supabase_object_stream(object_path: str, range_header: Optional
     }
     if range_header:
         headers["Range"] = range_header
-
-    async with httpx.AsyncClient(timeout=None, follow_redirects=True) as client:
-        upstream = await client.get(object_url, headers=headers)
-        # 200 or 206 expected; propagate errors
-        if upstream.status_code >= 400:
-            raise HTTPException(status_code=upstream.status_code, detail="Unable to fetch video content")
-
-        # Prepare headers to forward
-        forward_headers = {}
-        for h in [
-            "Content-Type",
-            "Content-Length",
-            "Content-Range",
-            "Accept-Ranges",
-            "ETag",
-            "Last-Modified",
-            "Cache-Control",
-        ]:
-            v = upstream.headers.get(h)
-            if v:
-                forward_headers[h] = v
-
-        status = upstream.status_code  # 200 or 206 for ranges
-
-        async def body_iter():
-            async for chunk in upstream.aiter_bytes(chunk_size=1024 * 256):
+    if if_none_match:
+        headers["If-None-Match"] = if_none_match
+    if if_modified_since:
+        headers["If-Modified-Since"] = if_modified_since
+
+    # Open the upstream response without buffering the body: bytes are relayed
+    # chunk by chunk, so memory per request stays O(chunk) instead of O(file)
+    client = get_http_client()
+    upstream = await client.send(client.build_request("GET", object_url, headers=headers), stream=True)
+    # 200 or 206 expected; propagate errors
+    if upstream.status_code >= 400:
+        await upstream.aclose()
+        raise HTTPException(status_code=upstream.status_code, detail="Unable to fetch video content")
+
+    # Prepare headers to forward
+    forward_headers = {}
+    for h in [
+        "Content-Type",
+        "Content-Length",
+        "Content-Encoding",
+        "Content-Range",
+        "Accept-Ranges",
+        "ETag",
+        "Last-Modified",
+        "Cache-Control",
+    ]:
+        v = upstream.headers.get(h)
+        if v:
+            forward_headers[h] = v
+
+    status = upstream.status_code  # 200 or 206 for ranges
+
+    # Defaults when storage doesn't say: let the player cache and seek by ranges
+    forward_headers.setdefault("Cache-Control", VIDEO_CACHE_CONTROL)
+    forward_headers.setdefault("Accept-Ranges", "bytes")
+
+    # Client copy is still fresh: answer without opening the body
+    if status == 304:
+        await upstream.aclose()
+        forward_headers.pop("Content-Length", None)
+        return Response(status_code=304, headers=forward_headers)
+
+    async def body_iter():
+        # Raw bytes: mp4 is already encoded, and Content-Length/Encoding are forwarded as-is
+        try:
+            async for chunk in upstream.aiter_raw(chunk_size=1024 * 1024):
                 yield chunk
-
-        return StarletteStreamingResponse(body_iter(), status_code=status, headers=forward_headers, media_type="video/mp4")
+        finally:
+            await upstream.aclose()
+
+    return StarletteStreamingResponse(
+        body_iter(),
+        status_code=status,
+        headers=forward_headers,
+        media_type="video/mp4",
+        background=BackgroundTask(upstream.aclose),
+    )
 
 # ============= MODELS =============
 
@@ -310,7 +725,7 @@ def normalize_ai_model(value: str) -> str:
         return normalized
     
     # Default fallback
-    print(f"⚠️ Unknown ai_model '{value}', defaulting to veo-3.1-generate-preview")
+    logger.warning("⚠️ Unknown ai_model '%s', defaulting to veo-3.1-generate-preview", value)
     return "veo-3.1-generate-preview"
 
 
@@ -431,6 +846,9 @@ class StoryboardShot(BaseModel):
     Scene: str
     duration: float
 
+# Built once: serializes a whole storyboard in a single pydantic-core call
+_SHOT_ADAPTER = TypeAdapter(List[StoryboardShot])
+
 class VideoRequestAdvanced(BaseModel):
     model_config = {"protected_namespaces": ()}
     
@@ -458,6 +876,7 @@ class YouTubeUploadRequest(BaseModel):
     description: Optional[str] = None  # Custom description, or auto-generated if not provided
     tags: Optional[List[str]] = None  # Custom tags, or default if not provided
     thumbnail_url: Optional[str] = None  # URL of pre-generated thumbnail (optional)
+    background: bool = False  # Upload in a background task, poll the status endpoint
 
 
 class YouTubeUploadResponse(BaseModel):
@@ -471,9 +890,19 @@ class YouTubeUploadResponse(BaseModel):
     scheduled_for_display: Optional[str] = None  # Human readable (Paris timezone)
     error: Optional[str] = None
     thumbnail_uploaded: bool = False
+    status: Optional[str] = None  # "queued" when the upload runs in the background
 
 # ============= FUNCTIONS =============
 
+# Niche → base prompt (built once, read-only)
+_NICHE_TEMPLATES = MappingProxyType({
+    "recettes": "Cinematic cooking video showing delicious recipe preparation, beautiful food styling, warm kitchen lighting, professional chef techniques, mouth-watering close-ups",
+    "voyage": "Breathtaking travel footage showcasing stunning landscapes, cinematic drone shots, golden hour lighting, epic adventure vibes, cultural exploration, scenic beauty",
+    "motivation": "Inspiring motivational content with dynamic visual metaphors, uplifting atmosphere, professional cinematography, energetic pacing, success imagery, empowering message",
+    "tech": "Modern technology showcase with sleek product presentation, futuristic aesthetics, clean minimalist style, innovative tech display, professional lighting, cutting-edge visuals"
+})
+_DEFAULT_TEMPLATE = "High-quality viral video content, engaging visuals, professional production"
+
 def generate_prompt(niche: str = None, custom_prompt: str = None, clip_index: int = None, total_clips: int = None, user_tier: str = "creator") -> str:
     """Génère un prompt optimisé pour la génération vidéo
     
@@ -485,51 +914,61 @@ def generate_prompt(niche: str = None, custom_prompt: str = None, clip_index: in
         user_tier: "creator" for 9:16 vertical or "professional" for 16:9 horizontal
     """
     
+    return _build_prompt(_base_for(niche, custom_prompt), clip_index, total_clips, user_tier)
+
+_PROFESSIONAL_FORMAT_SUFFIX = ", 16:9 horizontal widescreen format, professional commercial quality, cinematic"
+_CREATOR_FORMAT_SUFFIX = ", 9:16 vertical format, TikTok optimized, high quality, cinematic"
+
+@lru_cache(maxsize=256)
+def _base_for(niche: Optional[str], custom_prompt: Optional[str]) -> str:
+    """Custom prompt, or the niche template (case-insensitive, default if unknown)."""
     if custom_prompt:
-        base = custom_prompt
-    else:
-        templates = {
-            "recettes": "Cinematic cooking video showing delicious recipe preparation, beautiful food styling, warm kitchen lighting, professional chef techniques, mouth-watering close-ups",
-            "voyage": "Breathtaking travel footage showcasing stunning landscapes, cinematic drone shots, golden hour lighting, epic adventure vibes, cultural exploration, scenic beauty",
-            "motivation": "Inspiring motivational content with dynamic visual metaphors, uplifting atmosphere, professional cinematography, energetic pacing, success imagery, empowering message",
-            "tech": "Modern technology showcase with sleek product presentation, futuristic aesthetics, clean minimalist style, innovative tech display, professional lighting, cutting-edge visuals"
-        }
-        base = templates.get(niche.lower() if niche else "", f"High-quality viral video content, engaging visuals, professional production")
-    
+        return custom_prompt
+    return _NICHE_TEMPLATES.get(niche.lower() if niche else "", _DEFAULT_TEMPLATE)
+
+@lru_cache(maxsize=512)
+def _build_prompt(base: str, clip_index: Optional[int], total_clips: Optional[int], user_tier: str) -> str:
+    """Prompts only depend on their arguments (same job → same clip prompts), so they are memoized."""
     if clip_index is not None and total_clips is not None and total_clips > 1:
         sequence_info = f", dynamic scene {clip_index} of {total_clips}, smooth cinematic transition, continuous flow"
     else:
         sequence_info = ""
     
     # Determine format suffix based on tier
-    if user_tier == "professional":
-        format_suffix = ", 16:9 horizontal widescreen format, professional commercial quality, cinematic"
-    else:
-        format_suffix = ", 9:16 vertical format, TikTok optimized, high quality, cinematic"
+    format_suffix = _PROFESSIONAL_FORMAT_SUFFIX if user_tier == "professional" else _CREATOR_FORMAT_SUFFIX
     
     return f"{base}{sequence_info}{format_suffix}"
 
+# Clip length per model family (Veo 3.1 normal/fast: 8s, Sora: 10s) and credits per clip by quality
+VEO_MODELS = frozenset({"veo-3.1-generate-preview", "veo-3.1-fast-generate-preview"})
+VEO_SEGMENT_SECONDS = 8
+SORA_SEGMENT_SECONDS = 10
+_CREDITS_PER_CLIP = MappingProxyType({"basic": 1, "pro_720p": 3, "pro_1080p": 5})
+# Sora output size by quality (basic => provider default) and the clip lengths Sora accepts
+_SORA_SIZE_BY_QUALITY = MappingProxyType({"pro_720p": "1280x720", "pro_1080p": "1920x1080"})
+_SORA_SHOT_SECONDS = (4, 8, 12)
+
+def _sora_shot_seconds(shot_duration: float) -> int:
+    """Plus petite durée Sora (4/8/12s) couvrant la durée du shot"""
+    for seconds in _SORA_SHOT_SECONDS:
+        if shot_duration <= seconds:
+            return seconds
+    return _SORA_SHOT_SECONDS[-1]
+
+def calculate_num_clips(duration: int, ai_model: str) -> int:
+    """Nombre de clips générés pour une durée donnée"""
+    segment = VEO_SEGMENT_SECONDS if ai_model in VEO_MODELS else SORA_SEGMENT_SECONDS
+    return -(-duration // segment)
+
+@lru_cache(maxsize=256)
 def calculate_credits_cost(duration: int, quality: str, ai_model: str = "veo-3.1-generate-preview") -> int:
     """Calcule le coût en crédits selon la durée, la qualité et le modèle"""
-    # Veo 3.1 (normal et fast) uses 8s segments, Sora uses 10s segments
-    if ai_model in ("veo-3.1-generate-preview", "veo-3.1-fast-generate-preview"):
-        num_clips = (duration + 7) // 8
-    else:
-        num_clips = (duration + 9) // 10
-    
-    if quality == "basic":
-        return num_clips * 1
-    elif quality == "pro_720p":
-        return num_clips * 3
-    elif quality == "pro_1080p":
-        return num_clips * 5
-    else:
-        return num_clips
+    return calculate_num_clips(duration, ai_model) * _CREDITS_PER_CLIP.get(quality, 1)
 
 def _validate_duration_and_model(duration: int, ai_model: str):
     if duration < 6 or duration > 60:
         raise HTTPException(status_code=400, detail="Duration must be between 6 and 60 seconds")
-    if ai_model in ("veo-3.1-generate-preview", "veo-3.1-fast-generate-preview"):
+    if ai_model in VEO_MODELS:
         # Veo 3.1 (normal et fast) supports flexible durations
         pass  # Accept any duration between 6-60
     else:
@@ -604,6 +1043,12 @@ def _create_fallback_script(prompt: str, num_sequences: int, aspect_ratio: str)
     }
 
 
+# Reference images must be public objects of the video-images bucket on our Supabase project
+_SUPABASE_HOST = urlparse(SUPABASE_URL).netloc
+_ALLOWED_IMAGE_URL_RE = re.compile(
+    rf"https?://{re.escape(_SUPABASE_HOST) if _SUPABASE_HOST else '[^/?#]*'}/storage/v1/object/public/video-images/."
+)
+
 def _validate_image_urls(image_urls: Optional[List[str]], max_images: int = 18):
     """
     Validates image URLs for video generation.
@@ -621,20 +1066,94 @@ def _validate_image_urls(image_urls: Optional[List[str]], max_images: int = 18):
             detail=f"Too many images. Maximum allowed: {max_images}, provided: {len(image_urls)}"
         )
     
-    try:
-        supabase_host = urlparse(SUPABASE_URL).netloc
-    except Exception:
-        supabase_host = None
-    
     for url in image_urls:
+        # Fast path: one precompiled match for the valid case
+        if _ALLOWED_IMAGE_URL_RE.match(url):
+            continue
+        # Invalid: work out which rule failed for the error message
         parsed = urlparse(url)
         if not parsed.scheme.startswith("http"):
             raise HTTPException(status_code=400, detail="Invalid image URL scheme")
-        if supabase_host and parsed.netloc != supabase_host:
+        if _SUPABASE_HOST and parsed.netloc != _SUPABASE_HOST:
             raise HTTPException(status_code=400, detail="Image URLs must be hosted on Supabase Storage")
         if "/storage/v1/object/public/video-images/" not in url:
             raise HTTPException(status_code=400, detail="Image URL not in allowed bucket 'video-images'")
 
+def _get_or_create_profile(user_id: str) -> dict:
+    """Return the user's profile, creating a free one on first use.
+
+    Single round-trip: the ensure_profile RPC inserts if missing and returns the row.
+    Always read from the database (never the profile cache): the generate endpoints price
+    the job from this plan, and a plan change handled by another worker must apply at once.
+    The fresh row is written to the cache for the other readers.
+    """
+    profile = get_supabase().rpc("ensure_profile", {"p_user_id": user_id}).execute()
+    data = profile.data
+    data = data[0] if isinstance(data, list) else data
+    if data:
+        cache_profile(user_id, data)
+    return data
+
+def _get_profile(user_id: str) -> Optional[dict]:
+    """Return the user's full profile row (cached), or None if it does not exist."""
+    cached = get_cached_profile(user_id)
+    if cached is not None:
+        return cached
+    user = get_supabase().table("profiles").select("*").eq("id", user_id).maybe_single().execute()
+    if not user or not user.data:
+        return None
+    cache_profile(user_id, user.data)
+    return user.data
+
+# Worker threads for run_in_executor(None, ...) / asyncio.to_thread: generation calls block a
+# thread for minutes while polling, so the interpreter default (cpu_count + 4) starves small containers
+EXECUTOR_WORKERS = int(os.getenv("EXECUTOR_WORKERS", "64"))
+
+@app.on_event("startup")
+async def configure_default_executor():
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="vykso-worker")
+    )
+
+# Max Sora generations in flight per job (provider rate limits)
+SORA_MAX_CONCURRENCY = int(os.getenv("SORA_MAX_CONCURRENCY", "4"))
+# Attempts per storyboard shot generation before the shot is dropped
+SORA_SHOT_MAX_ATTEMPTS = 3
+
+def _is_retryable_sora_error(exc: Exception) -> bool:
+    """Only timeouts, 429 and 5xx are worth another (billed) attempt: content-policy
+    rejections, other 4xx and auth failures would fail the same way again."""
+    if isinstance(exc, (httpx.TimeoutException, _OpenAITimeoutError)):
+        return True
+    # httpx.HTTPStatusError and the SDK's APIStatusError both carry the response
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+def _read_file_bytes(path: str) -> bytes:
+    """Read a local file (called through a worker thread from async code)."""
+    with open(path, "rb") as f:
+        return f.read()
+
+async def _download_user_images(image_urls: List[str]) -> list:
+    """Download the user's reference images concurrently on the shared async client.
+    Failed downloads are skipped; order of the successful ones is preserved.
+    """
+    from PIL import Image
+
+    async def _fetch(img_url: str):
+        logger.info("📥 Downloading user image: %s...", img_url[:50])
+        resp = await get_http_client().get(img_url, timeout=30)
+        return Image.open(BytesIO(resp.content))
+
+    results = await asyncio.gather(*(_fetch(u) for u in image_urls), return_exceptions=True)
+    images = []
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("⚠️ Failed to download image: %s", result)
+        else:
+            images.append(result)
+    return images
+
 async def process_video_generation(
     job_id: str, 
     niche: str, 
@@ -671,17 +1190,25 @@ async def process_video_generation(
     """
     import asyncio
     from PIL import Image
-    import httpx
+    
+    upload_task = None
+    # Per-job scratch directory: every intermediate file lives here and is removed when the job ends
+    job_tmpdir = tempfile.TemporaryDirectory(prefix=f"vykso-{job_id}-", ignore_cleanup_errors=True)
+    job_tmp = job_tmpdir.name
     
     try:
-        print(f"🎬 Starting KEYFRAME-BASED generation for job {job_id}")
-        print(f"🤖 AI Model: {ai_model}")
-        print(f"📊 Model type: {model_type}")
-        print(f"👤 User tier: {user_tier.upper()}")
-        
-        get_supabase().table("video_jobs").update({
-            "status": "generating"
-        }).eq("id", job_id).execute()
+        logger.info("🎬 Starting KEYFRAME-BASED generation for job %s", job_id)
+        logger.info("🤖 AI Model: %s", ai_model)
+        logger.info("📊 Model type: %s", model_type)
+        logger.info("👤 User tier: %s", user_tier.upper())
+        
+        # Status + initial progress in a single write (first sequence needs no extra update)
+        await asyncio.to_thread(
+            lambda: get_supabase().table("video_jobs").update({
+                "status": "generating",
+                "progress": 0
+            }).eq("id", job_id).execute()
+        )
         
         # ===== CONFIGURATION BY TIER =====
         tier_config = get_tier_config(user_tier, ai_model)
@@ -691,33 +1218,28 @@ async def process_video_generation(
         transition_duration = tier_config.get("transition_duration", 0.3)
         resolution = tier_config.get("resolution", "720p")
         
-        print(f"📐 Config: {aspect_ratio}, {resolution}, {num_keyframes} keyframes/seq, transitions={add_transitions}")
+        logger.info("📐 Config: %s, %s, %s keyframes/seq, transitions=%s", aspect_ratio, resolution, num_keyframes, add_transitions)
         
         # ===== DÉTECTION DU MODÈLE AI =====
-        if ai_model in ("veo-3.1-generate-preview", "veo-3.1-fast-generate-preview"):
+        if ai_model in VEO_MODELS:
             # ===== VEO 3.1 WITH KEYFRAME ARCHITECTURE =====
             use_fast_model = (ai_model == "veo-3.1-fast-generate-preview")
             model_variant = "FAST" if use_fast_model else "NORMAL"
-            print(f"🎥 Using Veo 3.1 ({model_variant}) with KEYFRAME ARCHITECTURE")
+            logger.info("🎥 Using Veo 3.1 (%s) with KEYFRAME ARCHITECTURE", model_variant)
             
             # 1. Calculate number of sequences
-            num_sequences = max(1, (duration + 7) // 8)
-            print(f"📊 Video: {duration}s → {num_sequences} sequences of 8s each")
+            num_sequences = max(1, calculate_num_clips(duration, ai_model))
+            logger.info("📊 Video: %ss → %s sequences of %ss each", duration, num_sequences, VEO_SEGMENT_SECONDS)
             
             # 2. Download user images if provided
             user_pil_images = []
             if image_urls:
-                for img_url in image_urls[:18]:
-                    try:
-                        print(f"📥 Downloading user image: {img_url[:50]}...")
-                        resp = httpx.get(img_url, timeout=30)
-                        user_pil_images.append(Image.open(BytesIO(resp.content)))
-                    except Exception as e:
-                        print(f"⚠️ Failed to download image: {e}")
+                user_pil_images = await _download_user_images(image_urls[:18])
             
             # 3. Generate cinematic script with keyframe structure
-            print(f"📜 Generating CINEMATIC SCRIPT with {num_keyframes} keyframes per sequence...")
-            script = get_gemini().generate_cinematic_script(
+            logger.info("📜 Generating CINEMATIC SCRIPT with %s keyframes per sequence...", num_keyframes)
+            script = await asyncio.to_thread(
+                get_gemini().generate_cinematic_script,
                 user_prompt=custom_prompt or generate_prompt(niche, user_tier=user_tier),
                 duration=duration,
                 user_images=image_urls,
@@ -726,11 +1248,11 @@ async def process_video_generation(
             )
             
             if not script or "sequences" not in script:
-                print("⚠️ Script generation failed, using fallback method")
+                logger.warning("⚠️ Script generation failed, using fallback method")
                 script = _create_fallback_script(custom_prompt or generate_prompt(niche), num_sequences, aspect_ratio)
             
             sequences = script.get("sequences", [])
-            print(f"✅ Script ready: {len(sequences)} sequences")
+            logger.info("✅ Script ready: %s sequences", len(sequences))
             
             # 4. SEQUENTIAL VIDEO GENERATION WITH CONTINUITY
             # This is the key change - we process sequences ONE BY ONE
@@ -741,17 +1263,36 @@ async def process_video_generation(
             
             loop = asyncio.get_running_loop()
             
+            # Preview/per-sequence uploads are handed to a worker so they overlap
+            # with the generation of the next keyframe/sequence instead of blocking it
+            upload_queue = asyncio.Queue(maxsize=8)
+            
+            async def upload_worker():
+                while True:
+                    item = await upload_queue.get()
+                    if item is None:
+                        return
+                    upload_fn, data, filename = item
+                    try:
+                        await loop.run_in_executor(None, upload_fn, data, filename)
+                    except Exception as e:
+                        logger.warning("  ⚠️ Upload failed for %s: %s", filename, e)
+            
+            upload_task = asyncio.create_task(upload_worker())
+            
             for seq_idx, sequence in enumerate(sequences):
                 seq_num = seq_idx + 1
-                print(f"\n{'='*50}")
-                print(f"🎬 SEQUENCE {seq_num}/{len(sequences)}")
-                print(f"{'='*50}")
+                logger.debug("job %s: starting sequence %d/%d", job_id, seq_num, len(sequences))
+                logger.info("🎬 SEQUENCE %s/%s", seq_num, len(sequences))
                 
-                # Update progress in database
-                progress = int((seq_idx / len(sequences)) * 100)
-                get_supabase().table("video_jobs").update({
-                    "progress": progress
-                }).eq("id", job_id).execute()
+                # Update progress in database (0% was written with the "generating" status)
+                if seq_idx > 0:
+                    progress = int((seq_idx / len(sequences)) * 100)
+                    await asyncio.to_thread(
+                        lambda: get_supabase().table("video_jobs").update({
+                            "progress": progress
+                        }).eq("id", job_id).execute()
+                    )
                 
                 # Get keyframe prompts from script
                 kf_start_prompt = sequence.get("keyframe_start", "")
@@ -764,11 +1305,11 @@ async def process_video_generation(
                 
                 # KEYFRAME 1 (START): Use previous video's last frame OR generate new
                 if previous_last_frame is not None:
-                    print(f"  🔗 Using previous video's last frame as START keyframe (continuity)")
+                    logger.info("  🔗 Using previous video's last frame as START keyframe (continuity)")
                     keyframes.append(previous_last_frame)
                 else:
                     # First sequence - generate START keyframe
-                    print(f"  🖼️ Generating START keyframe...")
+                    logger.info("  🖼️ Generating START keyframe...")
                     
                     # Use user image as reference if available
                     ref_images = user_pil_images[:3] if user_pil_images else None
@@ -785,20 +1326,16 @@ async def process_video_generation(
                     
                     if kf_start_bytes:
                         keyframes.append(kf_start_bytes)
-                        # Upload for debug/preview to video-images bucket
-                        try:
-                            await loop.run_in_executor(
-                                None,
-                                get_uploader().upload_image_bytes,
-                                kf_start_bytes,
-                                f"{job_id}_seq{seq_num}_kf_start.jpg"
-                            )
-                        except Exception:
-                            pass
+                        # Upload for debug/preview to video-images bucket (background)
+                        await upload_queue.put((
+                            get_uploader().upload_image_bytes,
+                            kf_start_bytes,
+                            f"{job_id}_seq{seq_num}_kf_start.jpg"
+                        ))
                 
                 # KEYFRAME 2 (MIDDLE): Always generate
                 if num_keyframes >= 2:
-                    print(f"  🖼️ Generating MIDDLE keyframe...")
+                    logger.info("  🖼️ Generating MIDDLE keyframe...")
                     
                     kf_middle_bytes = await loop.run_in_executor(
                         None,
@@ -812,20 +1349,16 @@ async def process_video_generation(
                     
                     if kf_middle_bytes:
                         keyframes.append(kf_middle_bytes)
-                        # Upload for debug/preview to video-images bucket
-                        try:
-                            await loop.run_in_executor(
-                                None,
-                                get_uploader().upload_image_bytes,
-                                kf_middle_bytes,
-                                f"{job_id}_seq{seq_num}_kf_middle.jpg"
-                            )
-                        except Exception:
-                            pass
+                        # Upload for debug/preview to video-images bucket (background)
+                        await upload_queue.put((
+                            get_uploader().upload_image_bytes,
+                            kf_middle_bytes,
+                            f"{job_id}_seq{seq_num}_kf_middle.jpg"
+                        ))
                 
                 # KEYFRAME 3 (END): Always generate
                 if num_keyframes >= 3:
-                    print(f"  🖼️ Generating END keyframe...")
+                    logger.info("  🖼️ Generating END keyframe...")
                     
                     kf_end_bytes = await loop.run_in_executor(
                         None,
@@ -839,28 +1372,24 @@ async def process_video_generation(
                     
                     if kf_end_bytes:
                         keyframes.append(kf_end_bytes)
-                        # Upload for debug/preview to video-images bucket
-                        try:
-                            await loop.run_in_executor(
-                                None,
-                                get_uploader().upload_image_bytes,
-                                kf_end_bytes,
-                                f"{job_id}_seq{seq_num}_kf_end.jpg"
-                            )
-                        except Exception:
-                            pass
+                        # Upload for debug/preview to video-images bucket (background)
+                        await upload_queue.put((
+                            get_uploader().upload_image_bytes,
+                            kf_end_bytes,
+                            f"{job_id}_seq{seq_num}_kf_end.jpg"
+                        ))
                 
                 # Validate keyframes
                 if len(keyframes) == 0:
-                    print(f"  ⚠️ No keyframes generated, falling back to text-to-video")
+                    logger.warning("  ⚠️ No keyframes generated, falling back to text-to-video")
                     keyframes = None
                 else:
-                    print(f"  ✅ {len(keyframes)} keyframes ready for Veo")
+                    logger.info("  ✅ %s keyframes ready for Veo", len(keyframes))
                 
                 # GENERATE VIDEO WITH VEO 3.1
-                print(f"  🎥 Generating video with Veo 3.1 ({len(keyframes) if keyframes else 0} keyframes)...")
+                logger.info("  🎥 Generating video with Veo 3.1 (%s keyframes)...", len(keyframes) if keyframes else 0)
                 
-                video_path = f"/tmp/{job_id}_seq{seq_num}.mp4"
+                video_path = os.path.join(job_tmp, f"seq{seq_num}.mp4")
                 
                 if keyframes and len(keyframes) > 0:
                     # Use the new keyframe-based generation method
@@ -890,41 +1419,39 @@ async def process_video_generation(
                         )
                     )
                 
-                # Read video bytes
-                with open(video_path, "rb") as f:
-                    video_bytes = f.read()
+                # Read video bytes (off the event loop)
+                video_bytes = await loop.run_in_executor(None, _read_file_bytes, video_path)
                 
                 all_video_bytes.append(video_bytes)
-                print(f"  ✅ Sequence {seq_num} video generated: {len(video_bytes)} bytes")
+                logger.info("  ✅ Sequence %s video generated: %s bytes", seq_num, len(video_bytes))
                 
                 # EXTRACT LAST FRAME FOR NEXT SEQUENCE
                 if seq_idx < len(sequences) - 1:  # Not the last sequence
-                    print(f"  🔄 Extracting last frame for continuity...")
+                    logger.info("  🔄 Extracting last frame for continuity...")
                     try:
                         previous_last_frame = await loop.run_in_executor(
                             None,
                             lambda: get_video_editor().extract_last_frame(video_bytes)
                         )
-                        print(f"  ✅ Last frame extracted: {len(previous_last_frame)} bytes")
+                        logger.info("  ✅ Last frame extracted: %s bytes", len(previous_last_frame))
                     except Exception as e:
-                        print(f"  ⚠️ Failed to extract last frame: {e}")
+                        logger.warning("  ⚠️ Failed to extract last frame: %s", e)
                         previous_last_frame = None
                 
-                # Upload sequence video
-                try:
-                    await loop.run_in_executor(
-                        None,
+                # Upload sequence video (background); a single-sequence job is only uploaded as the final video
+                if len(sequences) > 1:
+                    await upload_queue.put((
                         get_uploader().upload_bytes,
                         video_bytes,
                         f"{job_id}_seq{seq_num}.mp4"
-                    )
-                except Exception:
-                    pass
+                    ))
+            
+            # No more uploads: the worker drains the queue while we merge
+            await upload_queue.put(None)
             
             # 5. CONCATENATE ALL VIDEOS
-            print(f"\n{'='*50}")
-            print(f"🎞️ MERGING {len(all_video_bytes)} sequences...")
-            print(f"{'='*50}")
+            logger.debug("job %s: merging %d sequences", job_id, len(all_video_bytes))
+            logger.info("🎞️ MERGING %s sequences...", len(all_video_bytes))
             
             if len(all_video_bytes) == 1:
                 final_video_bytes = all_video_bytes[0]
@@ -940,7 +1467,7 @@ async def process_video_generation(
                 )
             
             # 6. UPLOAD FINAL VIDEO
-            print(f"📤 Uploading final video ({len(final_video_bytes)} bytes)...")
+            logger.info("📤 Uploading final video (%s bytes)...", len(final_video_bytes))
             final_url = await loop.run_in_executor(
                 None,
                 get_uploader().upload_bytes,
@@ -948,48 +1475,46 @@ async def process_video_generation(
                 f"{job_id}.mp4"
             )
             
+            await upload_task
+            
             # 7. UPDATE JOB STATUS
-            get_supabase().table("video_jobs").update({
-                "status": "completed",
-                "video_url": final_url,
-                "progress": 100,
-                "completed_at": "now()",
-            }).eq("id", job_id).execute()
+            await asyncio.to_thread(
+                lambda: get_supabase().table("video_jobs").update({
+                    "status": "completed",
+                    "video_url": final_url,
+                    "size_bytes": len(final_video_bytes),
+                    "progress": 100,
+                    "completed_at": "now()",
+                }).eq("id", job_id).execute()
+            )
             
-            print(f"✅ Job {job_id} COMPLETED! URL: {final_url}")
+            logger.info("✅ Job %s COMPLETED! URL: %s", job_id, final_url)
         
         else:
             # ===== MODE SORA 2 (OpenAI Videos API) - Parallel Advanced Scripting =====
             use_pro_model = (ai_model == "sora-2-pro")
             model_variant = "PRO" if use_pro_model else "STANDARD"
-            print(f"🎥 Using Sora 2 API ({model_variant} mode) with Parallel Advanced Scripting")
-            print(f"🎨 User tier: {user_tier} - {'TikTok/Shorts optimized' if user_tier == 'creator' else 'Professional ads optimized'}")
+            logger.info("🎥 Using Sora 2 API (%s mode) with Parallel Advanced Scripting", model_variant)
+            logger.info("🎨 User tier: %s - %s", user_tier, 'TikTok/Shorts optimized' if user_tier == 'creator' else 'Professional ads optimized')
 
-            def quality_to_sora_params(q: str):
-                # Map simple: basic => default, pro_720p => size 1280x720, pro_1080p => size 1920x1080
-                if q == "pro_1080p":
-                    return "1920x1080"
-                if q == "pro_720p":
-                    return "1280x720"
-                return None
-
-            size = quality_to_sora_params(quality)
+            size = _SORA_SIZE_BY_QUALITY.get(quality)
 
             # 1. Calculate Segments (10s blocks for Sora)
-            num_segments = (duration + 9) // 10
+            num_segments = calculate_num_clips(duration, ai_model)
             
             # For Creator tier: simpler structure (1-3 images for scene changes)
             # For Professional tier: complex sequences with multiple shots
             images_per_segment = 1 if user_tier == "creator" else 3
             
             # 2. Generate Script using Gemini with tier-specific prompt enrichment
-            print(f"📜 Generating {user_tier.upper()} script for {duration}s video ({num_segments} segments)...")
-            script = get_gemini().generate_video_script(
+            logger.info("📜 Generating %s script for %ss video (%s segments)...", user_tier.upper(), duration, num_segments)
+            script = await asyncio.to_thread(
+                get_gemini().generate_video_script,
                 prompt=custom_prompt or generate_prompt(niche),
                 duration=duration,
                 num_segments=num_segments,
                 user_images=image_urls,
-                segment_duration=10,  # Sora uses 10s segments
+                segment_duration=SORA_SEGMENT_SECONDS,
                 user_tier=user_tier,
                 images_per_segment=images_per_segment
             )
@@ -997,33 +1522,22 @@ async def process_video_generation(
             # 3. Download user images if provided (now supports up to 18 images)
             user_pil_images = []
             if image_urls:
-                import httpx
-                from PIL import Image
-                for img_url in image_urls[:18]:  # Support up to 18 images
-                    try:
-                        print(f"📥 Downloading user image: {img_url[:50]}...")
-                        resp = httpx.get(img_url, timeout=30)
-                        user_pil_images.append(Image.open(BytesIO(resp.content)))
-                    except Exception as e:
-                        print(f"⚠️ Failed to download image: {e}")
-            
-            import asyncio
-            from concurrent.futures import ThreadPoolExecutor
+                user_pil_images = await _download_user_images(image_urls[:18])  # Support up to 18 images
             
             # Determine aspect ratio based on tier for Sora
             tier_aspect_ratio = get_aspect_ratio_for_tier(user_tier)
-            print(f"📐 Aspect ratio for {user_tier.upper()} tier (Sora): {tier_aspect_ratio}")
+            logger.info("📐 Aspect ratio for %s tier (Sora): %s", user_tier.upper(), tier_aspect_ratio)
             
-            async def process_sora_shot(segment_index, shot_data, user_images_list, tier=user_tier, aspect_ratio=tier_aspect_ratio):
+            async def process_sora_shot(segment_index, shot_data, user_images_list, tier=user_tier, aspect_ratio=tier_aspect_ratio, upload_clip=True):
                 """Helper to process a single shot: Image Gen -> Video Gen with Sora 2"""
                 shot_idx = shot_data.get("shot_index", 0)
                 img_prompt = shot_data.get("image_prompt")
                 vid_prompt = shot_data.get("video_prompt")
                 use_user_image_idx = shot_data.get("use_user_image_index")
-                shot_duration = shot_data.get("duration", 10)
+                shot_duration = shot_data.get("duration", SORA_SEGMENT_SECONDS)
                 scene_images = shot_data.get("scene_images", [])  # Additional scene variation prompts
                 
-                print(f"🎬 Processing Seg {segment_index} Shot {shot_idx} ({tier.upper()} tier, {aspect_ratio})...")
+                logger.info("🎬 Processing Seg %s Shot %s (%s tier, %s)...", segment_index, shot_idx, tier.upper(), aspect_ratio)
                 
                 loop = asyncio.get_running_loop()
                 
@@ -1031,15 +1545,13 @@ async def process_video_generation(
                 
                 # Check if we should use a user-provided image
                 if use_user_image_idx is not None and use_user_image_idx < len(user_images_list):
-                    print(f"  🖼️ Using user-provided image {use_user_image_idx} for this shot")
+                    logger.info("  🖼️ Using user-provided image %s for this shot", use_user_image_idx)
                     # Save user image to temp file for Sora
-                    import tempfile
-                    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                        user_images_list[use_user_image_idx].save(tmp.name)
-                        input_reference = tmp.name
+                    input_reference = os.path.join(job_tmp, f"seg{segment_index}_shot{shot_idx}_ref.png")
+                    user_images_list[use_user_image_idx].save(input_reference)
                 else:
                     # A. Generate Image with Gemini using enriched prompt and reference images
-                    print(f"  📸 Seg {segment_index} Shot {shot_idx}: Generating Image...")
+                    logger.info("  📸 Seg %s Shot %s: Generating Image...", segment_index, shot_idx)
                     
                     # Select reference images based on tier
                     ref_images_for_generation = None
@@ -1065,111 +1577,124 @@ async def process_video_generation(
                         
                         if image_bytes:
                             # Validate and save generated image for Sora input
-                            import tempfile
                             from PIL import Image as PILImage
                             try:
                                 # Validate the image first
                                 test_img = PILImage.open(BytesIO(image_bytes))
                                 test_img.load()  # Force load to verify
                                 
-                                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                                    tmp.write(image_bytes)
-                                    input_reference = tmp.name
-                                print(f"  ✅ Image generated successfully for Seg {segment_index} Shot {shot_idx}")
+                                image_path = os.path.join(job_tmp, f"seg{segment_index}_shot{shot_idx}.png")
+                                with open(image_path, "wb") as f:
+                                    f.write(image_bytes)
+                                input_reference = image_path
+                                logger.info("  ✅ Image generated successfully for Seg %s Shot %s", segment_index, shot_idx)
                                 
                                 # Upload generated image for reference
                                 try:
                                     await loop.run_in_executor(None, get_uploader().upload_bytes, image_bytes, f"{job_id}_seg{segment_index}_shot{shot_idx}.png")
                                 except Exception as e:
-                                    print(f"  ⚠️ Failed to upload generated image: {e}")
+                                    logger.warning("  ⚠️ Failed to upload generated image: %s", e)
                             except Exception as pil_err:
-                                print(f"  ⚠️ Image data invalid, proceeding with text-to-video: {pil_err}")
+                                logger.warning("  ⚠️ Image data invalid, proceeding with text-to-video: %s", pil_err)
                                 input_reference = None
                         else:
-                            print(f"  ⚠️ Image generation returned None, proceeding with text-to-video")
+                            logger.warning("  ⚠️ Image generation returned None, proceeding with text-to-video")
                     except Exception as img_gen_err:
-                        print(f"  ⚠️ Image generation failed, proceeding with text-to-video: {img_gen_err}")
+                        logger.warning("  ⚠️ Image generation failed, proceeding with text-to-video: %s", img_gen_err)
                         input_reference = None
 
                 # B. Generate Video with Sora 2
-                print(f"  🎥 Seg {segment_index} Shot {shot_idx}: Generating Video with Sora 2...")
+                logger.info("  🎥 Seg %s Shot %s: Generating Video with Sora 2...", segment_index, shot_idx)
                 
                 # Sora accepts 4, 8, or 12 second videos
-                sora_duration = 8  # Default to 8s
-                if shot_duration <= 4:
-                    sora_duration = 4
-                elif shot_duration <= 8:
-                    sora_duration = 8
-                else:
-                    sora_duration = 12
+                sora_duration = _sora_shot_seconds(shot_duration)
                 
-                local_path = await loop.run_in_executor(
-                    None, 
-                    lambda: get_sora().generate_video_and_wait(
-                        prompt=vid_prompt,
-                        use_pro=use_pro_model,
-                        size=size,
-                        seconds=sora_duration,
-                        input_reference=input_reference,
-                        download_path=f"/tmp/{job_id}_seg{segment_index}_shot{shot_idx}.mp4",
-                    )
-                )
+                # Bounded retries with exponential backoff, transient errors only (throttling, timeouts, 5xx)
+                for attempt in range(1, SORA_SHOT_MAX_ATTEMPTS + 1):
+                    try:
+                        local_path = await loop.run_in_executor(
+                            None, 
+                            lambda: get_sora().generate_video_and_wait(
+                                prompt=vid_prompt,
+                                use_pro=use_pro_model,
+                                size=size,
+                                seconds=sora_duration,
+                                input_reference=input_reference,
+                                download_path=os.path.join(job_tmp, f"seg{segment_index}_shot{shot_idx}.mp4"),
+                            )
+                        )
+                        break
+                    except Exception as gen_err:
+                        if attempt == SORA_SHOT_MAX_ATTEMPTS or not _is_retryable_sora_error(gen_err):
+                            raise
+                        delay = 2 ** attempt
+                        logger.warning("  ⚠️ Seg %s Shot %s: attempt %s failed (%s), retrying in %ss", segment_index, shot_idx, attempt, gen_err, delay)
+                        await asyncio.sleep(delay)
                 
-                # Upload clip
-                with open(local_path, "rb") as f:
-                    data = f.read()
-                url = await loop.run_in_executor(None, get_uploader().upload_bytes, data, f"{job_id}_seg{segment_index}_shot{shot_idx}.mp4")
-                return (segment_index, shot_idx, url)
+                # Upload clip (streamed from disk); skipped when it will be uploaded as the final video
+                url = None
+                if upload_clip:
+                    url = await loop.run_in_executor(None, get_uploader().upload_file, local_path, f"{job_id}_seg{segment_index}_shot{shot_idx}.mp4")
+                return (segment_index, shot_idx, url, local_path)
 
             all_clip_urls = []
+            # Local copies of the clips, concatenated directly (no re-download of what we just uploaded)
+            all_clip_paths = []
             
             if script and "segments" in script:
                 tasks = []
+                # At most SORA_MAX_CONCURRENCY shots in flight: the surplus would only be throttled
+                shot_semaphore = asyncio.Semaphore(SORA_MAX_CONCURRENCY)
+                
+                async def process_sora_shot_limited(segment_index, shot_data, user_images_list, upload_clip):
+                    async with shot_semaphore:
+                        return await process_sora_shot(segment_index, shot_data, user_images_list, upload_clip=upload_clip)
                 total_segments = len(script["segments"])
-                total_shots = 0
+                total_shots = sum(len(segment.get("shots", [])) for segment in script["segments"])
+                # Single-shot job: the clip is the final video, uploaded once under {job_id}.mp4
+                upload_shots = total_shots > 1
                 
                 # Create tasks for ALL shots across ALL segments
                 for segment in script["segments"]:
                     seg_idx = segment.get("segment_index", 0)
-                    shots = segment.get("shots", [])
-                    total_shots += len(shots)
-                    
-                    for shot in shots:
-                        tasks.append(process_sora_shot(seg_idx, shot, user_pil_images))
+                    for shot in segment.get("shots", []):
+                        tasks.append(process_sora_shot_limited(seg_idx, shot, user_pil_images, upload_shots))
                 
                 # Log detailed generation plan
-                expected_duration = total_segments * 10  # Sora uses 10s segments
-                print(f"📊 GENERATION PLAN (Sora):")
-                print(f"   - Requested duration: {duration}s")
-                print(f"   - Segments to generate: {total_segments}")
-                print(f"   - Total shots: {total_shots}")
-                print(f"   - Expected output duration: {expected_duration}s")
-                print(f"🚀 Launching {len(tasks)} parallel generation tasks with enriched prompts...")
-                # Run all tasks in parallel
+                expected_duration = total_segments * SORA_SEGMENT_SECONDS
+                logger.info("📊 GENERATION PLAN (Sora):")
+                logger.info("   - Requested duration: %ss", duration)
+                logger.info("   - Segments to generate: %s", total_segments)
+                logger.info("   - Total shots: %s", total_shots)
+                logger.info("   - Expected output duration: %ss", expected_duration)
+                logger.info("🚀 Launching %s parallel generation tasks with enriched prompts (max %s at once)...", len(tasks), SORA_MAX_CONCURRENCY)
+                # Run all tasks in parallel (bounded by the semaphore)
                 results = await asyncio.gather(*tasks, return_exceptions=True)
                 
                 # Process results
                 valid_results = []
                 for res in results:
                     if isinstance(res, Exception):
-                        print(f"❌ Task failed: {res}")
+                        logger.error("❌ Task failed: %s", res)
                     else:
                         valid_results.append(res)
                 
                 # Sort by segment then shot to ensure correct order
                 valid_results.sort(key=lambda x: (x[0], x[1]))
                 all_clip_urls = [r[2] for r in valid_results]
+                all_clip_paths = [r[3] for r in valid_results]
                 
             else:
                 # Fallback to simple generation if script generation fails
-                print("⚠️ Script generation failed, falling back to simple generation (Sora).")
+                logger.warning("⚠️ Script generation failed, falling back to simple generation (Sora).")
                 
                 # Determine aspect ratio based on tier
                 tier_aspect_ratio = get_aspect_ratio_for_tier(user_tier)
-                print(f"📐 Fallback using aspect ratio: {tier_aspect_ratio} for {user_tier.upper()} tier (Sora)")
+                logger.info("📐 Fallback using aspect ratio: %s for %s tier (Sora)", tier_aspect_ratio, user_tier.upper())
                 
                 # Generate a single video with the enriched prompt
-                enriched_prompt = get_gemini().enrich_prompt(
+                enriched_prompt = await asyncio.to_thread(
+                    get_gemini().enrich_prompt,
                     custom_prompt or generate_prompt(niche),
                     segment_context="Single video generation",
                     user_image_description=None,
@@ -1179,18 +1704,18 @@ async def process_video_generation(
                 # Use first user image if available
                 input_ref = None
                 if user_pil_images:
-                    import tempfile
-                    print(f"  🖼️ Using first user-provided image in Sora fallback mode")
-                    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                        user_pil_images[0].save(tmp.name)
-                        input_ref = tmp.name
+                    logger.info("  🖼️ Using first user-provided image in Sora fallback mode")
+                    input_ref = os.path.join(job_tmp, "fallback_ref.png")
+                    user_pil_images[0].save(input_ref)
                 
                 # For longer videos (>10s), generate multiple clips even in fallback mode
-                target_clips = max(1, (duration + 9) // 10)
-                print(f"  📹 Generating {target_clips} clip(s) for {duration}s video in Sora fallback mode")
+                target_clips = max(1, calculate_num_clips(duration, ai_model))
+                logger.info("  📹 Generating %s clip(s) for %ss video in Sora fallback mode", target_clips, duration)
+                
+                # Clips are independent here, so generate them concurrently (order kept by gather)
+                sora_semaphore = asyncio.Semaphore(SORA_MAX_CONCURRENCY)
                 
-                fallback_clip_urls = []
-                for clip_idx in range(target_clips):
+                async def generate_fallback_clip(clip_idx):
                     clip_prompt = enriched_prompt
                     if target_clips > 1:
                         clip_prompt = f"{enriched_prompt}, scene {clip_idx + 1} of {target_clips}, continuous narrative flow"
@@ -1198,68 +1723,82 @@ async def process_video_generation(
                     # Use user image only for first clip
                     clip_input_ref = input_ref if clip_idx == 0 else None
                     
-                    local_path = get_sora().generate_video_and_wait(
-                        prompt=clip_prompt,
-                        use_pro=use_pro_model,
-                        size=size,
-                        seconds=10,
-                        input_reference=clip_input_ref,
-                        download_path=f"/tmp/{job_id}_fallback_{clip_idx}.mp4",
-                    )
+                    async with sora_semaphore:
+                        local_path = await asyncio.to_thread(
+                            get_sora().generate_video_and_wait,
+                            prompt=clip_prompt,
+                            use_pro=use_pro_model,
+                            size=size,
+                            seconds=SORA_SEGMENT_SECONDS,
+                            input_reference=clip_input_ref,
+                            download_path=os.path.join(job_tmp, f"fallback_{clip_idx}.mp4"),
+                        )
                     
-                    with open(local_path, "rb") as f:
-                        data = f.read()
-                    url = get_uploader().upload_bytes(data, f"{job_id}_fallback_{clip_idx}.mp4")
-                    fallback_clip_urls.append(url)
-                    print(f"  ✅ Sora fallback clip {clip_idx + 1}/{target_clips} generated")
+                    url = None
+                    if target_clips > 1:
+                        url = await asyncio.to_thread(get_uploader().upload_file, local_path, f"{job_id}_fallback_{clip_idx}.mp4")
+                    logger.info("  ✅ Sora fallback clip %s/%s generated", clip_idx + 1, target_clips)
+                    return url, local_path
                 
-                all_clip_urls = fallback_clip_urls
+                fallback_clips = await asyncio.gather(
+                    *(generate_fallback_clip(clip_idx) for clip_idx in range(target_clips))
+                )
+                all_clip_urls = [url for url, _ in fallback_clips]
+                all_clip_paths = [path for _, path in fallback_clips]
 
             if len(all_clip_urls) == 1:
-                final_url = all_clip_urls[0]
+                # Single clip: no concat, one upload straight to the canonical name
+                final_url = all_clip_urls[0] or await asyncio.to_thread(get_uploader().upload_file, all_clip_paths[0], f"{job_id}.mp4")
+                final_size = os.path.getsize(all_clip_paths[0])
             elif len(all_clip_urls) > 1:
-                print(f"🎞️ Concatenating {len(all_clip_urls)} Sora clips...")
-                concatenated_data = get_video_editor().concatenate_videos(all_clip_urls, f"{job_id}.mp4")
-                final_url = get_uploader().upload_bytes(concatenated_data, f"{job_id}.mp4")
+                logger.info("🎞️ Concatenating %s Sora clips...", len(all_clip_urls))
+                # ffmpeg concat (stream copy of the local clips) and the upload are blocking: run them in worker threads
+                concatenated_data = await asyncio.to_thread(get_video_editor().concatenate_files, all_clip_paths, f"{job_id}.mp4")
+                final_url = await asyncio.to_thread(get_uploader().upload_bytes, concatenated_data, f"{job_id}.mp4")
+                final_size = len(concatenated_data)
             else:
                 raise Exception("No clips generated")
 
-            get_supabase().table("video_jobs").update({
-                "status": "completed",
-                "video_url": final_url,
-                "completed_at": "now()",
-            }).eq("id", job_id).execute()
+            await asyncio.to_thread(
+                lambda: get_supabase().table("video_jobs").update({
+                    "status": "completed",
+                    "video_url": final_url,
+                    "size_bytes": final_size,
+                    "completed_at": "now()",
+                }).eq("id", job_id).execute()
+            )
 
-            print(f"✅ Job {job_id} completed! (credits already deducted)")
+            logger.info("✅ Job %s completed! (credits already deducted)", job_id)
         
     except Exception as e:
-        print(f"❌ Error generating video {job_id}: {e}")
+        logger.error("❌ Error generating video %s: %s", job_id, e)
         import traceback
         traceback.print_exc()
         
-        # REFUND CREDITS
+        if upload_task is not None and not upload_task.done():
+            upload_task.cancel()
+        
+        # MARK FAILED + REFUND CREDITS (single round-trip, amount read from the job's cost)
         try:
-            print(f"💰 Refunding credits for job {job_id} due to failure...")
-            # We need to calculate amount to refund. 
-            # We can re-calculate or store cost in metadata. 
-            # For now, re-calculate based on job data if possible, but we don't have it handy easily without query.
-            # Let's assume we can pass it or query it.
-            # Ideally we should have stored 'cost' in video_jobs.
-            # For now, let's just query the job to get duration/quality if needed, or pass it to this function.
-            # We passed duration/quality to this function!
-            cost = calculate_credits_cost(duration, quality, ai_model)
-            get_supabase().rpc("refund_credits", {
-                "p_user_id": user_id,
-                "p_amount": cost
-            }).execute()
-            print(f"✅ Refunded {cost} credits.")
+            logger.info("💰 Refunding credits for job %s due to failure...", job_id)
+            await asyncio.to_thread(
+                lambda: get_supabase().rpc("fail_video_job", {
+                    "p_job_id": job_id,
+                    "p_error": str(e)
+                }).execute()
+            )
+            invalidate_profile(user_id)
+            logger.info("✅ Job marked failed, credits refunded.")
         except Exception as refund_error:
-            print(f"❌ Error refunding credits: {refund_error}")
-
-        get_supabase().table("video_jobs").update({
-            "status": "failed",
-            "error": str(e)
-        }).eq("id", job_id).execute()
+            logger.error("❌ Error refunding credits: %s", refund_error)
+            await asyncio.to_thread(
+                lambda: get_supabase().table("video_jobs").update({
+                    "status": "failed",
+                    "error": str(e)
+                }).eq("id", job_id).in_("status", ["pending", "generating"]).execute()
+            )
+    finally:
+        await asyncio.to_thread(job_tmpdir.cleanup)
 
 # ============= ENDPOINTS =============
 
@@ -1291,32 +1830,20 @@ async def generate_video(req: VideoRequest, background_tasks: BackgroundTasks, r
     req.user_id = token_user_id
     
     try:
-        user = get_supabase().table("profiles").select("*").eq("id", req.user_id).execute()
-        
-        if not user.data:
-            print(f"👤 Creating new user: {req.user_id}")
-            get_supabase().table("profiles").insert({
-                "id": req.user_id,
-                "email": f"{req.user_id}@vykso.com",
-                "credits": 10,
-                "plan": "free"
-            }).execute()
-            user = get_supabase().table("profiles").select("*").eq("id", req.user_id).execute()
-        
-        user_data = user.data[0]
+        user_data = await asyncio.to_thread(_get_or_create_profile, req.user_id)
         user_plan = user_data.get("plan", "free")
         user_tier = get_user_tier(user_plan)
-        print(f"👤 User: {req.user_id}, Credits: {user_data['credits']}, Plan: {user_plan}, Tier: {user_tier}")
+        logger.info("👤 User: %s, Credits: %s, Plan: %s, Tier: %s", req.user_id, user_data['credits'], user_plan, user_tier)
         
     except Exception as e:
-        print(f"❌ Error checking user: {e}")
+        logger.error("❌ Error checking user: %s", e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
     # For CREATOR tier: Force fixed duration (no choice)
     if is_creator_plan(user_plan):
         fixed_duration = get_fixed_duration_for_creator(req.ai_model)
         req.duration = fixed_duration
-        print(f"👤 Creator tier detected - forcing duration to {fixed_duration}s")
+        logger.info("👤 Creator tier detected - forcing duration to %ss", fixed_duration)
 
     # Validate model/duration
     _validate_duration_and_model(req.duration, req.ai_model)
@@ -1325,51 +1852,56 @@ async def generate_video(req: VideoRequest, background_tasks: BackgroundTasks, r
         raise HTTPException(status_code=400, detail="Either niche or custom_prompt is required")
     
     # Calculate clips based on model (8s for Veo 3.1/fast, 10s for Sora)
-    if req.ai_model in ("veo-3.1-generate-preview", "veo-3.1-fast-generate-preview"):
-        num_clips = (req.duration + 7) // 8
-    else:
-        num_clips = (req.duration + 9) // 10
+    num_clips = calculate_num_clips(req.duration, req.ai_model)
     required_credits = calculate_credits_cost(req.duration, req.quality, req.ai_model)
     
-    # Deduct credits atomically BEFORE scheduling work (backend source of truth)
+    # Check + deduct credits atomically BEFORE scheduling work (backend source of truth)
     try:
-        decrement = get_supabase().rpc("decrement_credits", {
-            "p_user_id": req.user_id,
-            "p_amount": required_credits,
-        }).execute()
-        if not decrement.data:
+        reserved = await asyncio.to_thread(
+            lambda: get_supabase().rpc("reserve_credits", {
+                "p_user_id": req.user_id,
+                "p_amount": required_credits,
+            }).execute()
+        )
+        if reserved.data is None:
+            invalidate_profile(req.user_id)
             raise HTTPException(
                 status_code=402,
                 detail=f"Insufficient credits. Need {required_credits} credits."
             )
+        # Write the post-debit balance through for the cached readers (profile, credits endpoints)
+        cache_profile(req.user_id, {**user_data, "credits": reserved.data})
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error decrementing credits: {e}")
+        logger.error("❌ Error decrementing credits: %s", e)
         raise HTTPException(status_code=500, detail="Unable to deduct credits")
     
     try:
-        job = get_supabase().table("video_jobs").insert({
-            "user_id": req.user_id,
-            "status": "pending",
-            "niche": req.niche or "custom",
-            "duration": req.duration,
-            "quality": req.quality,
-            "prompt": req.custom_prompt or generate_prompt(req.niche),
-            "metadata": json.dumps({
-                "num_clips": num_clips,
-                "target_duration": req.duration,
-                "custom_prompt": req.custom_prompt,
-                "ai_model": req.ai_model,
-                "user_tier": user_tier
-            })
-        }).execute()
+        job = await asyncio.to_thread(
+            lambda: get_supabase().table("video_jobs").insert({
+                "user_id": req.user_id,
+                "status": "pending",
+                "niche": req.niche or "custom",
+                "duration": req.duration,
+                "quality": req.quality,
+                "prompt": req.custom_prompt or generate_prompt(req.niche),
+                "cost": required_credits,
+                "metadata": {
+                    "num_clips": num_clips,
+                    "target_duration": req.duration,
+                    "custom_prompt": req.custom_prompt,
+                    "ai_model": req.ai_model,
+                    "user_tier": user_tier
+                }
+            }).execute()
+        )
         
         job_id = job.data[0]["id"]
-        print(f"📋 Job created: {job_id}")
+        logger.info("📋 Job created: %s", job_id)
         
     except Exception as e:
-        print(f"❌ Error creating job: {e}")
+        logger.error("❌ Error creating job: %s", e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
     background_tasks.add_task(
@@ -1411,18 +1943,7 @@ async def generate_video_advanced(req: VideoRequestAdvanced, background_tasks: B
 
     # Vérifier user pour déterminer le tier
     try:
-        user = get_supabase().table("profiles").select("*").eq("id", req.user_id).execute()
-        
-        if not user.data:
-            get_supabase().table("profiles").insert({
-                "id": req.user_id,
-                "email": f"{req.user_id}@vykso.com",
-                "credits": 10,
-                "plan": "free"
-            }).execute()
-            user = get_supabase().table("profiles").select("*").eq("id", req.user_id).execute()
-        
-        user_data = user.data[0]
+        user_data = await asyncio.to_thread(_get_or_create_profile, req.user_id)
         user_plan = user_data.get("plan", "free")
         user_tier = get_user_tier(user_plan)
         
@@ -1433,7 +1954,7 @@ async def generate_video_advanced(req: VideoRequestAdvanced, background_tasks: B
     if is_creator_plan(user_plan):
         fixed_duration = get_fixed_duration_for_creator(req.ai_model)
         req.duration = fixed_duration
-        print(f"👤 Creator tier detected - forcing duration to {fixed_duration}s")
+        logger.info("👤 Creator tier detected - forcing duration to %ss", fixed_duration)
 
     # Calculer la durée totale pour storyboard
     if req.model_type == "storyboard" and req.shots:
@@ -1454,13 +1975,17 @@ async def generate_video_advanced(req: VideoRequestAdvanced, background_tasks: B
     required_credits = calculate_credits_cost(req.duration, req.quality, req.ai_model)
     
     try:
-        # Deduct credits BEFORE scheduling generation
-        decrement = get_supabase().rpc("decrement_credits", {
-            "p_user_id": req.user_id,
-            "p_amount": required_credits,
-        }).execute()
-        if not decrement.data:
+        # Check + deduct credits atomically BEFORE scheduling generation
+        reserved = await asyncio.to_thread(
+            lambda: get_supabase().rpc("reserve_credits", {
+                "p_user_id": req.user_id,
+                "p_amount": required_credits,
+            }).execute()
+        )
+        if reserved.data is None:
+            invalidate_profile(req.user_id)
             raise HTTPException(status_code=402, detail="Insufficient credits")
+        cache_profile(req.user_id, {**user_data, "credits": reserved.data})
         
     except HTTPException:
         raise
@@ -1469,22 +1994,25 @@ async def generate_video_advanced(req: VideoRequestAdvanced, background_tasks: B
     
     # Créer job
     try:
-        job = get_supabase().table("video_jobs").insert({
-            "user_id": req.user_id,
-            "status": "pending",
-            "niche": req.niche or ("storyboard" if req.model_type == "storyboard" else "custom"),
-            "duration": req.duration,
-            "quality": req.quality,
-            "prompt": req.custom_prompt or generate_prompt(req.niche),
-            "metadata": json.dumps({
-                "model_type": req.model_type,
-                "has_images": bool(req.image_urls),
-                "num_images": len(req.image_urls) if req.image_urls else 0,
-                "num_shots": len(req.shots) if req.shots else 0,
-                "ai_model": req.ai_model,
-                "user_tier": user_tier
-            })
-        }).execute()
+        job = await asyncio.to_thread(
+            lambda: get_supabase().table("video_jobs").insert({
+                "user_id": req.user_id,
+                "status": "pending",
+                "niche": req.niche or ("storyboard" if req.model_type == "storyboard" else "custom"),
+                "duration": req.duration,
+                "quality": req.quality,
+                "prompt": req.custom_prompt or generate_prompt(req.niche),
+                "cost": required_credits,
+                "metadata": {
+                    "model_type": req.model_type,
+                    "has_images": bool(req.image_urls),
+                    "num_images": len(req.image_urls) if req.image_urls else 0,
+                    "num_shots": len(req.shots) if req.shots else 0,
+                    "ai_model": req.ai_model,
+                    "user_tier": user_tier
+                }
+            }).execute()
+        )
         
         job_id = job.data[0]["id"]
         
@@ -1492,7 +2020,7 @@ async def generate_video_advanced(req: VideoRequestAdvanced, background_tasks: B
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
     # Lancer génération with user_tier
-    shots_dict = [shot.dict() for shot in req.shots] if req.shots else None
+    shots_dict = _SHOT_ADAPTER.dump_python(req.shots) if req.shots else None
     
     background_tasks.add_task(
         process_video_generation, 
@@ -1524,9 +2052,11 @@ async def get_video_status(job_id: str, request: Request):
     try:
         # Require auth and ensure ownership
         token_user_id = await _get_authenticated_user_id(request)
-        job = get_supabase().table("video_jobs").select("*").eq("id", job_id).single().execute()
+        job = await asyncio.to_thread(
+            lambda: get_supabase().table("video_jobs").select("*").eq("id", job_id).maybe_single().execute()
+        )
         
-        if not job.data:
+        if not job or not job.data:
             raise HTTPException(status_code=404, detail="Job not found")
         
         job_data = job.data
@@ -1534,10 +2064,11 @@ async def get_video_status(job_id: str, request: Request):
         if job_data.get("user_id") != token_user_id:
             raise HTTPException(status_code=403, detail="Forbidden")
         
-        if job_data.get("metadata"):
+        # Metadata is stored as a JSONB object; older rows hold a JSON-encoded string
+        if isinstance(job_data.get("metadata"), str):
             try:
-                job_data["metadata"] = json.loads(job_data["metadata"])
-            except:
+                job_data["metadata"] = orjson.loads(job_data["metadata"])
+            except orjson.JSONDecodeError:
                 pass
         
         return job_data
@@ -1545,9 +2076,15 @@ async def get_video_status(job_id: str, request: Request):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error getting job status: {e}")
+        logger.error("❌ Error getting job status: %s", e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+# Upper bound on a single page of the video history (keeps the query working set bounded)
+MAX_VIDEOS_PAGE_SIZE = 100
+# Columns returned by the listing: the job row as clients have always received it (metadata
+# included), minus the background youtube_upload state (own status endpoint) and size_bytes
+_VIDEO_LIST_COLUMNS = "id, user_id, status, niche, duration, quality, prompt, video_url, metadata, progress, error, cost, created_at, completed_at"
+
 @app.get("/api/users/{user_id}/videos")
 async def get_user_videos(user_id: str, request: Request, limit: int = 20, offset: int = 0):
     """Liste les vidéos d'un utilisateur"""
@@ -1556,10 +2093,15 @@ async def get_user_videos(user_id: str, request: Request, limit: int = 20, offse
         token_user_id = await _get_authenticated_user_id(request)
         if token_user_id != user_id:
             raise HTTPException(status_code=403, detail="Forbidden")
-        videos = get_supabase().table("video_jobs").select("*").eq("user_id", user_id).order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+        limit = max(1, min(limit, MAX_VIDEOS_PAGE_SIZE))
+        offset = max(0, offset)
+        # count="exact" returns the user's total row count with the page (same round-trip)
+        videos = await asyncio.to_thread(
+            lambda: get_supabase().table("video_jobs").select(_VIDEO_LIST_COLUMNS, count="exact").eq("user_id", user_id).order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+        )
         
         return {
-            "total": len(videos.data),
+            "total": videos.count if videos.count is not None else len(videos.data),
             "videos": videos.data
         }
     except Exception as e:
@@ -1573,12 +2115,12 @@ async def get_user_info(user_id: str, request: Request):
         token_user_id = await _get_authenticated_user_id(request)
         if token_user_id != user_id:
             raise HTTPException(status_code=403, detail="Forbidden")
-        user = get_supabase().table("profiles").select("*").eq("id", user_id).single().execute()
+        profile = await asyncio.to_thread(_get_profile, user_id)
         
-        if not user.data:
+        if not profile:
             raise HTTPException(status_code=404, detail="User not found")
         
-        return user.data
+        return profile
     except HTTPException:
         raise
     except Exception as e:
@@ -1609,13 +2151,13 @@ async def get_user_tier_info(user_id: str, request: Request):
         if token_user_id != user_id:
             raise HTTPException(status_code=403, detail="Forbidden")
         
-        user = get_supabase().table("profiles").select("plan, credits").eq("id", user_id).single().execute()
+        profile = await asyncio.to_thread(_get_profile, user_id)
         
-        if not user.data:
+        if not profile:
             raise HTTPException(status_code=404, detail="User not found")
         
-        plan = user.data.get("plan", "free")
-        credits = user.data.get("credits", 0)
+        plan = profile.get("plan", "free")
+        credits = profile.get("credits", 0)
         tier = get_user_tier(plan)
         is_creator = is_creator_plan(plan)
         aspect_ratio = get_aspect_ratio_for_tier(tier)
@@ -1669,8 +2211,10 @@ async def sync_user_from_auth(user_data: dict, request: Request):
         token_user_id = await _get_authenticated_user_id(request)
         user_id = user_data.get("id")
         email = user_data.get("email")
-        first_name = user_data.get("user_metadata", {}).get("first_name") or user_data.get("user_metadata", {}).get("full_name", "").split()[0] if user_data.get("user_metadata", {}).get("full_name") else None
-        last_name = user_data.get("user_metadata", {}).get("last_name") or " ".join(user_data.get("user_metadata", {}).get("full_name", "").split()[1:]) if user_data.get("user_metadata", {}).get("full_name") and len(user_data.get("user_metadata", {}).get("full_name", "").split()) > 1 else None
+        meta = user_data.get("user_metadata") or {}
+        name_parts = (meta.get("full_name") or "").split()
+        first_name = meta.get("first_name") or (name_parts[0] if name_parts else None)
+        last_name = meta.get("last_name") or (" ".join(name_parts[1:]) if len(name_parts) > 1 else None)
         
         if not user_id:
             raise HTTPException(status_code=400, detail="User ID is required")
@@ -1678,40 +2222,236 @@ async def sync_user_from_auth(user_data: dict, request: Request):
         if token_user_id and user_id and token_user_id != user_id:
             raise HTTPException(status_code=403, detail="Forbidden")
         
-        # Check if user exists
-        existing = get_supabase().table("profiles").select("*").eq("id", user_id).execute()
-        
-        update_data = {
+        profile_data = {
+            "id": user_id,
             "email": email or f"{user_id}@vykso.com",
         }
         
         if first_name:
-            update_data["first_name"] = first_name
+            profile_data["first_name"] = first_name
         if last_name:
-            update_data["last_name"] = last_name
+            profile_data["last_name"] = last_name
         
-        if existing.data:
-            # Update existing user
-            result = get_supabase().table("profiles").update(update_data).eq("id", user_id).execute()
-        else:
-            # Create new user
-            update_data.update({
-                "id": user_id,
-                "credits": 10,
-                "plan": "free"
-            })
-            result = get_supabase().table("profiles").insert(update_data).execute()
+        # Single upsert: new profiles get the column defaults (10 credits, free plan),
+        # existing ones only have email/names updated (credits and plan untouched)
+        result = await asyncio.to_thread(
+            lambda: get_supabase().table("profiles").upsert(profile_data, on_conflict="id").execute()
+        )
+        invalidate_profile(user_id)
         
         return {"success": True, "user": result.data[0] if result.data else None}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error syncing user: {e}")
+        logger.error("❌ Error syncing user: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _perform_youtube_upload(
+    job_id: str,
+    job_data: dict,
+    tokens: dict,
+    body: YouTubeUploadRequest,
+) -> YouTubeUploadResponse:
+    """Generate the metadata, fetch video + thumbnail and upload to YouTube (validated job, fresh tokens)."""
+    video_url = job_data.get("video_url")
+    original_prompt = job_data.get("prompt", "AI Generated Video")
+    
+    # 3. Generate or use provided content (AI title and description requested concurrently)
+    async def _title():
+        if body.title:
+            return body.title
+        logger.info("🎯 Generating clickbait title...")
+        return await asyncio.to_thread(get_content_generator().generate_clickbait_title, original_prompt)
+    
+    async def _description():
+        if body.description:
+            return body.description
+        logger.info("📝 Generating description...")
+        return await asyncio.to_thread(get_content_generator().generate_description, original_prompt)
+    
+    final_title, final_description = await asyncio.gather(_title(), _description())
+    
+    # Ensure #Shorts is present
+    final_title, final_description = get_content_generator().check_shorts_tag_present(
+        final_title, final_description
+    )
+    
+    # Tags
+    final_tags = get_content_generator().get_default_tags(body.tags)
+    
+    # 4. Calculate schedule time if requested
+    schedule_time_iso = None
+    schedule_time_display = None
+    final_privacy = body.privacy
+    
+    if body.schedule:
+        logger.info("📅 Calculating optimal publish time...")
+        optimal_time = get_schedule_calculator().calculate_optimal_publish_time()
+        schedule_time_iso = get_schedule_calculator().format_for_youtube_api(optimal_time)
+        schedule_time_display = get_schedule_calculator().format_for_display(optimal_time)
+        # When scheduling, privacy MUST be 'private'
+        final_privacy = 'private'
+        logger.info("⏰ Scheduled for: %s", schedule_time_display)
+    
+    # 5-6. Download the video and get the thumbnail concurrently (independent I/O)
+    path = _extract_object_path_from_public_url(video_url, VIDEOS_BUCKET)
+    # Per-run file: a sync and a background upload of the same job must not share it
+    temp_video_path = f"/tmp/{job_id}_{uuid.uuid4().hex[:8]}_upload.mp4"
+    
+    async def _fetch_video():
+        logger.info("📥 Downloading video for upload...")
+        if not path:
+            # Try direct download if it's a full URL
+            await _download_to_file(video_url, temp_video_path)
+        else:
+            # Authenticated object endpoint (works for private buckets), streamed to disk
+            await _download_to_file(
+                f"{SUPABASE_URL}/storage/v1/object/{VIDEOS_BUCKET}/{path}",
+                temp_video_path,
+                {"Authorization": f"Bearer {SUPABASE_SERVICE_KEY}", "Accept": "application/octet-stream"},
+            )
+    
+    async def _fetch_thumbnail():
+        thumbnail_bytes = None
+        
+        if body.thumbnail_url:
+            # Download thumbnail from provided URL
+            logger.info("📥 Downloading provided thumbnail...")
+            try:
+                r = await get_http_client().get(body.thumbnail_url, timeout=30)
+                if r.status_code == 200:
+                    thumbnail_bytes = r.content
+                else:
+                    logger.warning("⚠️ Failed to download thumbnail: HTTP %s", r.status_code)
+            except Exception as e:
+                logger.warning("⚠️ Failed to download thumbnail: %s", e)
+            # No Imagen fallback for an explicit thumbnail: the caller reports the failure
+            return thumbnail_bytes
+        
+        # Generate thumbnail with Imagen (optimized for YouTube Shorts 9:16)
+        logger.info("🖼️ Generating YouTube Shorts thumbnail with AI...")
+        try:
+            thumbnail_bytes, thumbnail_path = await asyncio.to_thread(
+                get_gemini().generate_thumbnail,
+                title=final_title,
+                description=final_description,
+                original_prompt=original_prompt
+            )
+            
+            # Save thumbnail path to video_jobs metadata
+            if thumbnail_path:
+                try:
+                    current_metadata = job_data.get("metadata")
+                    if isinstance(current_metadata, str):
+                        current_metadata = orjson.loads(current_metadata)
+                    elif current_metadata is None:
+                        current_metadata = {}
+                    
+                    current_metadata["thumbnail_path"] = thumbnail_path
+                    
+                    await asyncio.to_thread(
+                        lambda: get_supabase().table("video_jobs").update({
+                            "metadata": current_metadata
+                        }).eq("id", job_id).execute()
+                    )
+                    logger.info("💾 Thumbnail path saved to metadata: %s", thumbnail_path)
+                except Exception as e:
+                    logger.warning("⚠️ Failed to save thumbnail path to metadata: %s", e)
+                    
+        except Exception as e:
+            logger.warning("⚠️ Thumbnail generation failed: %s", e)
+            # Continue without thumbnail - YouTube will auto-generate one
+        
+        return thumbnail_bytes
+    
+    try:
+        _, thumbnail_bytes = await asyncio.gather(_fetch_video(), _fetch_thumbnail())
+        if body.thumbnail_url and not thumbnail_bytes:
+            raise HTTPException(status_code=400, detail="Provided thumbnail_url could not be fetched")
+        
+        # 7. Upload to YouTube with thumbnail
+        logger.info("🚀 Uploading to YouTube...")
+        result = await asyncio.to_thread(
+            get_youtube().upload_video_with_thumbnail,
+            file_path=temp_video_path,
+            title=final_title,
+            description=final_description,
+            credentials_dict=tokens,
+            privacy=final_privacy,
+            tags=final_tags,
+            schedule_time=schedule_time_iso,
+            thumbnail_bytes=thumbnail_bytes
+        )
+    finally:
+        # 8. Cleanup temp file
+        try:
+            os.remove(temp_video_path)
+        except OSError:
+            pass
+    
+    # 9. Return response
+    if result.success:
+        return YouTubeUploadResponse(
+            success=True,
+            youtube_id=result.youtube_id,
+            youtube_url=result.youtube_url,
+            title=final_title,
+            description=final_description,
+            scheduled_for=schedule_time_iso,
+            scheduled_for_display=schedule_time_display,
+            thumbnail_uploaded=result.thumbnail_uploaded
+        )
+    else:
+        return YouTubeUploadResponse(
+            success=False,
+            error=result.error
+        )
+
+# A queued/uploading state older than this is considered lost (worker restart, dropped task)
+YOUTUBE_UPLOAD_STALE_AFTER = int(os.getenv("YOUTUBE_UPLOAD_STALE_AFTER", "3600"))
+
+def _youtube_upload_in_progress(state: dict) -> bool:
+    """True when a background upload is queued/uploading and its state was updated recently."""
+    if state.get("status") not in ("queued", "uploading"):
+        return False
+    try:
+        updated_at = datetime.fromisoformat(state["updated_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return (datetime.now(timezone.utc) - updated_at).total_seconds() < YOUTUBE_UPLOAD_STALE_AFTER
+
+async def _set_youtube_upload_state(job_id: str, state: dict):
+    """Persist the background YouTube upload state on the job (video_jobs.youtube_upload)."""
+    state["updated_at"] = datetime.now(timezone.utc).isoformat()
+    await asyncio.to_thread(
+        lambda: get_supabase().table("video_jobs").update({
+            "youtube_upload": state
+        }).eq("id", job_id).execute()
+    )
+
+async def _youtube_upload_job(job_id: str, job_data: dict, tokens: dict, body: YouTubeUploadRequest):
+    """Background task: run the upload and record its outcome for the status endpoint."""
+    try:
+        await _set_youtube_upload_state(job_id, {"status": "uploading"})
+        result = await _perform_youtube_upload(job_id, job_data, tokens, body)
+        state = result.model_dump(exclude_none=True)
+        state["status"] = "completed" if result.success else "failed"
+    except Exception as e:
+        logger.error("❌ Background YouTube upload error for job %s: %s", job_id, e)
+        state = {"success": False, "status": "failed", "error": str(e)}
+    try:
+        await _set_youtube_upload_state(job_id, state)
+    except Exception as e:
+        logger.error("❌ Failed to record YouTube upload state for job %s: %s", job_id, e)
+
 @app.post("/api/videos/{job_id}/upload-youtube", response_model=YouTubeUploadResponse)
-async def upload_video_to_youtube(job_id: str, request: Request, body: YouTubeUploadRequest = None):
+async def upload_video_to_youtube(
+    job_id: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    body: YouTubeUploadRequest = None,
+):
     """
     Upload a generated video to YouTube with flexible options.
     
@@ -1722,11 +2462,11 @@ async def upload_video_to_youtube(job_id: str, request: Request, body: YouTubeUp
     - description: Custom description (auto-generated if not provided)
     - tags: Custom tags list (defaults to ['Shorts', 'AI', 'Vykso'])
     - thumbnail_url: URL of pre-generated thumbnail (auto-generated with Imagen if not provided)
+    - background: If true, return immediately (status "queued") and upload in the background;
+      poll GET /api/videos/{job_id}/upload-youtube/status for the result
     
     Returns YouTube video URL, ID, and scheduled time if applicable.
     """
-    import requests as req_lib
-    
     token_user_id = await _get_authenticated_user_id(request)
     
     # Default body if not provided
@@ -1735,28 +2475,28 @@ async def upload_video_to_youtube(job_id: str, request: Request, body: YouTubeUp
     
     try:
         # 1. Get User YouTube Tokens from profiles table
-        user = get_supabase().table("profiles").select("youtube_tokens").eq("id", token_user_id).single().execute()
-        if not user.data or not user.data.get("youtube_tokens"):
+        profile = await asyncio.to_thread(_get_profile, token_user_id)
+        if not profile or not profile.get("youtube_tokens"):
             raise HTTPException(
                 status_code=400, 
                 detail="YouTube account not connected. Please connect your YouTube account first."
             )
         
-        tokens = user.data["youtube_tokens"]
+        tokens = profile["youtube_tokens"]
         
         # Validate tokens have all required fields
         required_fields = ['token', 'refresh_token', 'token_uri', 'client_id', 'client_secret']
         missing_fields = [f for f in required_fields if not tokens.get(f)]
         
         if missing_fields:
-            print(f"❌ YouTube tokens missing fields: {missing_fields}")
+            logger.error("❌ YouTube tokens missing fields: %s", missing_fields)
             raise HTTPException(
                 status_code=400,
                 detail=f"Your YouTube connection is incomplete (missing: {', '.join(missing_fields)}). Please disconnect and reconnect your YouTube account."
             )
         
         # Refresh tokens if needed
-        refreshed_tokens = get_youtube().refresh_credentials(tokens)
+        refreshed_tokens = await asyncio.to_thread(get_youtube().refresh_credentials, tokens)
         if refreshed_tokens is None:
             raise HTTPException(
                 status_code=400,
@@ -1764,14 +2504,19 @@ async def upload_video_to_youtube(job_id: str, request: Request, body: YouTubeUp
             )
         if refreshed_tokens != tokens:
             # Update tokens in database
-            get_supabase().table("profiles").update({
-                "youtube_tokens": refreshed_tokens
-            }).eq("id", token_user_id).execute()
+            await asyncio.to_thread(
+                lambda: get_supabase().table("profiles").update({
+                    "youtube_tokens": refreshed_tokens
+                }).eq("id", token_user_id).execute()
+            )
+            invalidate_profile(token_user_id)
             tokens = refreshed_tokens
         
         # 2. Get Video Job Data
-        job = get_supabase().table("video_jobs").select("*").eq("id", job_id).single().execute()
-        if not job.data:
+        job = await asyncio.to_thread(
+            lambda: get_supabase().table("video_jobs").select("*").eq("id", job_id).maybe_single().execute()
+        )
+        if not job or not job.data:
             raise HTTPException(status_code=404, detail="Job not found")
         
         # Verify ownership
@@ -1782,150 +2527,43 @@ async def upload_video_to_youtube(job_id: str, request: Request, body: YouTubeUp
         if not video_url:
             raise HTTPException(status_code=400, detail="Video not ready")
         
-        original_prompt = job.data.get("prompt", "AI Generated Video")
-        
-        # 3. Generate or use provided content
-        # Title
-        if body.title:
-            final_title = body.title
-        else:
-            print("🎯 Generating clickbait title...")
-            final_title = get_content_generator().generate_clickbait_title(original_prompt)
-        
-        # Description
-        if body.description:
-            final_description = body.description
-        else:
-            print("📝 Generating description...")
-            final_description = get_content_generator().generate_description(original_prompt)
-        
-        # Ensure #Shorts is present
-        final_title, final_description = get_content_generator().check_shorts_tag_present(
-            final_title, final_description
-        )
-        
-        # Tags
-        final_tags = get_content_generator().get_default_tags(body.tags)
-        
-        # 4. Calculate schedule time if requested
-        schedule_time_iso = None
-        schedule_time_display = None
-        final_privacy = body.privacy
-        
-        if body.schedule:
-            print("📅 Calculating optimal publish time...")
-            optimal_time = get_schedule_calculator().calculate_optimal_publish_time()
-            schedule_time_iso = get_schedule_calculator().format_for_youtube_api(optimal_time)
-            schedule_time_display = get_schedule_calculator().format_for_display(optimal_time)
-            # When scheduling, privacy MUST be 'private'
-            final_privacy = 'private'
-            print(f"⏰ Scheduled for: {schedule_time_display}")
-        
-        # 5. Download video to temp file
-        print(f"📥 Downloading video for upload...")
-        path = _extract_object_path_from_public_url(video_url, VIDEOS_BUCKET)
-        if not path:
-            # Try direct download if it's a full URL
-            r = req_lib.get(video_url, timeout=60)
-            video_data = r.content
-        else:
-            video_data = get_supabase().storage.from_(VIDEOS_BUCKET).download(path)
-        
-        temp_video_path = f"/tmp/{job_id}_upload.mp4"
-        with open(temp_video_path, "wb") as f:
-            f.write(video_data)
-        
-        # 6. Generate or download thumbnail
-        thumbnail_bytes = None
-        thumbnail_path = None
-        
-        if body.thumbnail_url:
-            # Download thumbnail from provided URL
-            print(f"📥 Downloading provided thumbnail...")
-            try:
-                r = req_lib.get(body.thumbnail_url, timeout=30)
-                if r.status_code == 200:
-                    thumbnail_bytes = r.content
-            except Exception as e:
-                print(f"⚠️ Failed to download thumbnail: {e}")
-        
-        if not thumbnail_bytes:
-            # Generate thumbnail with Imagen (optimized for YouTube Shorts 9:16)
-            print("🖼️ Generating YouTube Shorts thumbnail with AI...")
-            try:
-                thumbnail_bytes, thumbnail_path = get_gemini().generate_thumbnail(
-                    title=final_title,
-                    description=final_description,
-                    original_prompt=original_prompt
-                )
-                
-                # Save thumbnail path to video_jobs metadata
-                if thumbnail_path:
-                    try:
-                        current_metadata = job.data.get("metadata")
-                        if isinstance(current_metadata, str):
-                            current_metadata = json.loads(current_metadata)
-                        elif current_metadata is None:
-                            current_metadata = {}
-                        
-                        current_metadata["thumbnail_path"] = thumbnail_path
-                        
-                        get_supabase().table("video_jobs").update({
-                            "metadata": json.dumps(current_metadata)
-                        }).eq("id", job_id).execute()
-                        print(f"💾 Thumbnail path saved to metadata: {thumbnail_path}")
-                    except Exception as e:
-                        print(f"⚠️ Failed to save thumbnail path to metadata: {e}")
-                        
-            except Exception as e:
-                print(f"⚠️ Thumbnail generation failed: {e}")
-                # Continue without thumbnail - YouTube will auto-generate one
+        if body.background:
+            if _youtube_upload_in_progress(job.data.get("youtube_upload") or {}):
+                raise HTTPException(status_code=409, detail="A YouTube upload is already in progress for this video")
+            await _set_youtube_upload_state(job_id, {"status": "queued"})
+            background_tasks.add_task(_youtube_upload_job, job_id, job.data, tokens, body)
+            return YouTubeUploadResponse(success=True, status="queued")
         
-        # 7. Upload to YouTube with thumbnail
-        print(f"🚀 Uploading to YouTube...")
-        result = get_youtube().upload_video_with_thumbnail(
-            file_path=temp_video_path,
-            title=final_title,
-            description=final_description,
-            credentials_dict=tokens,
-            privacy=final_privacy,
-            tags=final_tags,
-            schedule_time=schedule_time_iso,
-            thumbnail_bytes=thumbnail_bytes
-        )
-        
-        # 8. Cleanup temp file
-        try:
-            os.remove(temp_video_path)
-        except:
-            pass
-        
-        # 9. Return response
-        if result.success:
-            return YouTubeUploadResponse(
-                success=True,
-                youtube_id=result.youtube_id,
-                youtube_url=result.youtube_url,
-                title=final_title,
-                description=final_description,
-                scheduled_for=schedule_time_iso,
-                scheduled_for_display=schedule_time_display,
-                thumbnail_uploaded=result.thumbnail_uploaded
-            )
-        else:
-            return YouTubeUploadResponse(
-                success=False,
-                error=result.error
-            )
+        return await _perform_youtube_upload(job_id, job.data, tokens, body)
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ YouTube upload error: {e}")
+        logger.error("❌ YouTube upload error: %s", e)
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/videos/{job_id}/upload-youtube/status")
+async def get_youtube_upload_status(job_id: str, request: Request):
+    """
+    State of the background YouTube upload started with background=true.
+    
+    Returns {"status": "none"} if no background upload was requested, otherwise
+    status ("queued", "uploading", "completed", "failed") with the upload result fields.
+    """
+    token_user_id = await _get_authenticated_user_id(request)
+    
+    job = await asyncio.to_thread(
+        lambda: get_supabase().table("video_jobs").select("user_id, youtube_upload").eq("id", job_id).maybe_single().execute()
+    )
+    if not job or not job.data:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.data.get("user_id") != token_user_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    
+    return job.data.get("youtube_upload") or {"status": "none"}
+
 # ============= YOUTUBE AUTH ENDPOINTS =============
 
 @app.get("/api/auth/youtube/url")
@@ -1941,7 +2579,8 @@ async def youtube_auth_callback(code: str, state: str):
     """
     try:
         user_id = state
-        credentials = get_youtube().get_credentials_from_code(code)
+        # OAuth token exchange and DB write are blocking: keep them off the event loop
+        credentials = await asyncio.to_thread(get_youtube().get_credentials_from_code, code)
         
         # Convert credentials to dict - ensure ALL required fields are saved
         creds_dict = {
@@ -1955,22 +2594,25 @@ async def youtube_auth_callback(code: str, state: str):
         
         # Validate that we got a refresh_token (required for long-term access)
         if not creds_dict.get('refresh_token'):
-            print("⚠️ Warning: No refresh_token received from Google. User may need to revoke app access and reconnect.")
+            logger.warning("⚠️ Warning: No refresh_token received from Google. User may need to revoke app access and reconnect.")
         
         # Log credential fields for debugging (not values, just keys)
-        print(f"📝 Storing YouTube credentials with fields: {list(creds_dict.keys())}")
-        print(f"📝 Refresh token present: {bool(creds_dict.get('refresh_token'))}")
-        print(f"📝 Token URI: {creds_dict.get('token_uri')}")
+        logger.info("📝 Storing YouTube credentials with fields: %s", list(creds_dict.keys()))
+        logger.info("📝 Refresh token present: %s", bool(creds_dict.get('refresh_token')))
+        logger.info("📝 Token URI: %s", creds_dict.get('token_uri'))
         
         # Store in DB
-        get_supabase().table("profiles").update({
-            "youtube_tokens": creds_dict
-        }).eq("id", user_id).execute()
+        await asyncio.to_thread(
+            lambda: get_supabase().table("profiles").update({
+                "youtube_tokens": creds_dict
+            }).eq("id", user_id).execute()
+        )
+        invalidate_profile(user_id)
         
         return {"status": "success", "message": "YouTube connected successfully"}
         
     except Exception as e:
-        print(f"❌ YouTube callback error: {e}")
+        logger.error("❌ YouTube callback error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1984,17 +2626,20 @@ async def disconnect_youtube(request: Request):
         token_user_id = await _get_authenticated_user_id(request)
         
         # Clear YouTube tokens
-        get_supabase().table("profiles").update({
-            "youtube_tokens": None
-        }).eq("id", token_user_id).execute()
+        await asyncio.to_thread(
+            lambda: get_supabase().table("profiles").update({
+                "youtube_tokens": None
+            }).eq("id", token_user_id).execute()
+        )
+        invalidate_profile(token_user_id)
         
-        print(f"🔌 YouTube disconnected for user {token_user_id}")
+        logger.info("🔌 YouTube disconnected for user %s", token_user_id)
         return {"status": "success", "message": "YouTube account disconnected successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ YouTube disconnect error: {e}")
+        logger.error("❌ YouTube disconnect error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -2006,12 +2651,12 @@ async def get_youtube_status(request: Request):
     try:
         token_user_id = await _get_authenticated_user_id(request)
         
-        user = get_supabase().table("profiles").select("youtube_tokens").eq("id", token_user_id).single().execute()
+        profile = await asyncio.to_thread(_get_profile, token_user_id)
         
-        if not user.data or not user.data.get("youtube_tokens"):
+        if not profile or not profile.get("youtube_tokens"):
             return {"connected": False, "valid": False, "message": "YouTube not connected"}
         
-        tokens = user.data["youtube_tokens"]
+        tokens = profile["youtube_tokens"]
         
         # Check for required fields
         required_fields = ['token', 'refresh_token', 'token_uri', 'client_id', 'client_secret']
@@ -2029,7 +2674,7 @@ async def get_youtube_status(request: Request):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ YouTube status check error: {e}")
+        logger.error("❌ YouTube status check error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ============= STRIPE ENDPOINTS =============
@@ -2102,7 +2747,8 @@ async def create_checkout_session(req: CheckoutRequest, request: Request):
     internal_plan_name = config.get_plan_name_from_price_id(price_id)
     
     try:
-        session = stripe.checkout.Session.create(
+        session = await asyncio.to_thread(
+            stripe.checkout.Session.create,
             payment_method_types=['card'],
             line_items=[{
                 'price': price_id,
@@ -2110,8 +2756,8 @@ async def create_checkout_session(req: CheckoutRequest, request: Request):
             }],
             mode='subscription',
             allow_promotion_codes=True,
-            success_url=f"{os.getenv('FRONTEND_URL', 'https://vykso.lovable.app')}/payment-success?session_id={{CHECKOUT_SESSION_ID}}",
-            cancel_url=f"{os.getenv('FRONTEND_URL', 'https://vykso.lovable.app')}/pricing",
+            success_url=CHECKOUT_SUCCESS_URL,
+            cancel_url=CHECKOUT_CANCEL_PRICING_URL,
             client_reference_id=req.user_id,
             metadata={
                 'user_id': req.user_id,
@@ -2135,15 +2781,15 @@ async def create_checkout_session(req: CheckoutRequest, request: Request):
             }
         )
         
-        print(f"✅ Checkout session created for {plan_info['name']}")
-        print(f"   Plan: {internal_plan_name} ({tier_type})")
-        print(f"   Interval: {plan_info['interval']}")
-        print(f"   Credits: {plan_info['credits']}")
+        logger.info("✅ Checkout session created for %s", plan_info['name'])
+        logger.info("   Plan: %s (%s)", internal_plan_name, tier_type)
+        logger.info("   Interval: %s", plan_info['interval'])
+        logger.info("   Credits: %s", plan_info['credits'])
         
         return {"checkout_url": session.url}
     
     except Exception as e:
-        print(f"❌ Stripe error: {e}")
+        logger.error("❌ Stripe error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/stripe/buy-credits")
@@ -2168,7 +2814,8 @@ async def buy_credits(req: BuyCreditsRequest, request: Request):
         raise HTTPException(status_code=400, detail="Invalid amount for selected credits pack")
 
     try:
-        session = stripe.checkout.Session.create(
+        session = await asyncio.to_thread(
+            stripe.checkout.Session.create,
             payment_method_types=['card'],
             line_items=[{
                 'price_data': {
@@ -2182,8 +2829,8 @@ async def buy_credits(req: BuyCreditsRequest, request: Request):
                 'quantity': 1,
             }],
             mode='payment',
-            success_url=f"{os.getenv('FRONTEND_URL', 'https://vykso.lovable.app')}/payment-success?session_id={{CHECKOUT_SESSION_ID}}",
-            cancel_url=f"{os.getenv('FRONTEND_URL', 'https://vykso.lovable.app')}/credits",
+            success_url=CHECKOUT_SUCCESS_URL,
+            cancel_url=CHECKOUT_CANCEL_CREDITS_URL,
             client_reference_id=req.user_id,
             metadata={
                 'user_id': req.user_id,
@@ -2195,9 +2842,25 @@ async def buy_credits(req: BuyCreditsRequest, request: Request):
         return {"checkout_url": session.url}
     
     except Exception as e:
-        print(f"❌ Stripe error: {e}")
+        logger.error("❌ Stripe error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Events the legacy webhook acts on (everything else is acknowledged without any work)
+_LEGACY_WEBHOOK_EVENTS = frozenset({
+    "checkout.session.completed",
+    "invoice.payment_succeeded",
+    "customer.subscription.deleted",
+})
+# Old plan → monthly credits mapping, used when neither metadata nor config give a value
+_LEGACY_PLAN_CREDITS = MappingProxyType({
+    "starter": 600, "starter_annual": 600,
+    "pro": 1200, "pro_annual": 1200,
+    "max": 1800, "max_annual": 1800,
+    "creator_basic": 100, "creator_basic_yearly": 100,
+    "creator_pro": 200, "creator_pro_yearly": 200,
+    "creator_max": 300, "creator_max_yearly": 300,
+})
+
 @app.post("/api/webhooks/stripe-legacy")
 async def stripe_webhook_legacy(request: Request):
     """
@@ -2211,18 +2874,22 @@ async def stripe_webhook_legacy(request: Request):
     sig_header = request.headers.get('stripe-signature')
     
     try:
-        event = stripe.Webhook.construct_event(
-            payload, sig_header, os.getenv("STRIPE_WEBHOOK_SECRET")
+        event = await asyncio.to_thread(
+            stripe.Webhook.construct_event,
+            payload, sig_header, STRIPE_WEBHOOK_SECRET
         )
     except ValueError as e:
-        print(f"❌ Invalid payload: {e}")
+        logger.error("❌ Invalid payload: %s", e)
         raise HTTPException(status_code=400, detail="Invalid payload")
     except stripe.error.SignatureVerificationError as e:
-        print(f"❌ Invalid signature: {e}")
+        logger.error("❌ Invalid signature: %s", e)
         raise HTTPException(status_code=400, detail="Invalid signature")
     
+    logger.info("📨 Received Stripe webhook (legacy): %s", event['type'])
+    if event['type'] not in _LEGACY_WEBHOOK_EVENTS:
+        return {"status": "ignored"}
+    
     config = get_stripe_config()
-    print(f"📨 Received Stripe webhook (legacy): {event['type']}")
     
     if event['type'] == 'checkout.session.completed':
         session = event['data']['object']
@@ -2232,13 +2899,13 @@ async def stripe_webhook_legacy(request: Request):
         if metadata.get('type') == 'credit_purchase':
             credits_to_add = int(metadata.get('credits', 0))
             
-            print(f"💳 Credit purchase: {credits_to_add} credits for user {user_id}")
+            logger.info("💳 Credit purchase: %s credits for user %s", credits_to_add, user_id)
             
             try:
-                add_credits_to_user(user_id, credits_to_add)
-                print(f"✅ Added {credits_to_add} credits to user {user_id}")
+                await asyncio.to_thread(add_credits_to_user, user_id, credits_to_add)
+                logger.info("✅ Added %s credits to user %s", credits_to_add, user_id)
             except Exception as e:
-                print(f"❌ Error adding credits: {e}")
+                logger.error("❌ Error adding credits: %s", e)
         
         elif metadata.get('type') == 'subscription':
             subscription_id = session.get('subscription')
@@ -2255,23 +2922,12 @@ async def stripe_webhook_legacy(request: Request):
             
             # Fallback to old mapping if still 0
             if credits == 0:
-                professional_credits_map = {
-                    "starter": 600, "starter_annual": 600,
-                    "pro": 1200, "pro_annual": 1200,
-                    "max": 1800, "max_annual": 1800
-                }
-                creator_credits_map = {
-                    "creator_basic": 100, "creator_basic_yearly": 100,
-                    "creator_pro": 200, "creator_pro_yearly": 200,
-                    "creator_max": 300, "creator_max_yearly": 300
-                }
-                credits_map = {**professional_credits_map, **creator_credits_map}
-                credits = credits_map.get(plan, 100 if tier_type == "creator" else 600)
+                credits = _LEGACY_PLAN_CREDITS.get(plan, 100 if tier_type == "creator" else 600)
             
-            print(f"✅ Subscription {plan} ({tier_type} tier) for user {user_id}")
+            logger.info("✅ Subscription %s (%s tier) for user %s", plan, tier_type, user_id)
             
             try:
-                update_user_subscription(user_id, {
+                await asyncio.to_thread(update_user_subscription, user_id, {
                     'plan': plan,
                     'credits': credits,
                     'stripe_customer_id': customer_id,
@@ -2280,9 +2936,9 @@ async def stripe_webhook_legacy(request: Request):
                     'plan_family': tier_type,
                 })
                 
-                print(f"✅ User {user_id} upgraded to {plan} ({tier_type} tier) with {credits} credits")
+                logger.info("✅ User %s upgraded to %s (%s tier) with %s credits", user_id, plan, tier_type, credits)
             except Exception as e:
-                print(f"❌ Error updating user: {e}")
+                logger.error("❌ Error updating user: %s", e)
     
     elif event['type'] == 'invoice.payment_succeeded':
         invoice = event['data']['object']
@@ -2291,7 +2947,7 @@ async def stripe_webhook_legacy(request: Request):
         
         if subscription_id and billing_reason == 'subscription_cycle':
             try:
-                user = get_user_by_stripe_subscription(subscription_id)
+                user = await asyncio.to_thread(get_user_by_stripe_subscription, subscription_id)
                 
                 if user:
                     plan = user.get('plan', 'free')
@@ -2301,25 +2957,14 @@ async def stripe_webhook_legacy(request: Request):
                     
                     # Fallback to old mapping
                     if credits == 0:
-                        professional_credits_map = {
-                            "starter": 600, "starter_annual": 600,
-                            "pro": 1200, "pro_annual": 1200,
-                            "max": 1800, "max_annual": 1800
-                        }
-                        creator_credits_map = {
-                            "creator_basic": 100, "creator_basic_yearly": 100,
-                            "creator_pro": 200, "creator_pro_yearly": 200,
-                            "creator_max": 300, "creator_max_yearly": 300
-                        }
-                        credits_map = {**professional_credits_map, **creator_credits_map}
                         tier_type = "creator" if plan.startswith("creator_") else "professional"
-                        credits = credits_map.get(plan, 100 if tier_type == "creator" else 600)
+                        credits = _LEGACY_PLAN_CREDITS.get(plan, 100 if tier_type == "creator" else 600)
                     
-                    update_user_subscription(user['id'], {'credits': credits})
+                    await asyncio.to_thread(update_user_subscription, user['id'], {'credits': credits})
                     
-                    print(f"✅ Monthly credits recharged for user {user['id']}: {credits} credits")
+                    logger.info("✅ Monthly credits recharged for user %s: %s credits", user['id'], credits)
             except Exception as e:
-                print(f"❌ Error recharging credits: {e}")
+                logger.error("❌ Error recharging credits: %s", e)
     
     elif event['type'] == 'customer.subscription.deleted':
         subscription = event['data']['object']
@@ -2327,13 +2972,13 @@ async def stripe_webhook_legacy(request: Request):
         user_id = metadata.get('user_id') or metadata.get('userId')
         
         if not user_id:
-            user = get_user_by_stripe_subscription(subscription['id'])
+            user = await asyncio.to_thread(get_user_by_stripe_subscription, subscription['id'])
             if user:
                 user_id = user.get('id')
         
         if user_id:
-            print(f"🚫 Subscription canceled for user {user_id}")
-            update_user_subscription(user_id, {
+            logger.info("🚫 Subscription canceled for user %s", user_id)
+            await asyncio.to_thread(update_user_subscription, user_id, {
                 'status': 'canceled',
                 'credits': 0,
                 'plan': 'free',
@@ -2347,30 +2992,28 @@ async def download_video(job_id: str, request: Request):
     try:
         # Require auth and ensure ownership
         token_user_id = await _get_authenticated_user_id(request)
-        job = get_supabase().table("video_jobs").select("video_url, niche, created_at, user_id").eq("id", job_id).single().execute()
-        if not job.data:
-            raise HTTPException(status_code=404, detail="Video not found")
+        job_meta = await _get_job_meta(job_id)
+        if not job_meta:
+            return Response(content=_VIDEO_NOT_FOUND_BODY, status_code=404, media_type="application/json")
 
-        if job.data.get("user_id") != token_user_id:
+        if job_meta.get("user_id") != token_user_id:
             raise HTTPException(status_code=403, detail="Forbidden")
 
-        video_url = job.data.get("video_url")
-        if not video_url:
-            raise HTTPException(status_code=404, detail="Video URL not available")
-
-        object_path = _extract_object_path_from_public_url(video_url, VIDEOS_BUCKET)
-        if not object_path:
-            # Fallback: try to use the filename from URL
-            object_path = video_url.rstrip("/").split("/")[-1]
+        if not job_meta.get("video_url"):
+            return Response(content=_VIDEO_URL_UNAVAILABLE_BODY, status_code=404, media_type="application/json")
 
-        # Build filename
-        niche = job.data.get("niche", "video")
-        created_at = job.data.get("created_at", "")[:10]
-        filename = f"vykso_{niche}_{created_at}_{job_id[:8]}.mp4"
+        # Object path and filename prefix are precomputed by _get_job_meta
+        object_path = job_meta["object_path"]
+        filename = f"{job_meta['filename_prefix']}.mp4"
 
         # Proxy with range support
         range_header = request.headers.get("range") or request.headers.get("Range")
-        stream_resp = await _proxy_supabase_object_stream(object_path, range_header)
+        stream_resp = await _proxy_supabase_object_stream(
+            object_path,
+            range_header,
+            request.headers.get("if-none-match"),
+            request.headers.get("if-modified-since"),
+        )
         # Force attachment disposition for downloads
         stream_resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
         return stream_resp
@@ -2378,38 +3021,81 @@ async def download_video(job_id: str, request: Request):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Download error: {e}")
+        logger.exception("❌ Download error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.head("/api/videos/{job_id}/stream")
+async def stream_video_head(job_id: str, request: Request):
+    """Métadonnées du flux (taille, type, ranges) pour les players, servies depuis le cache job sans lire l'objet."""
+    token_user_id = await _get_authenticated_user_id(request)
+    job_meta = await _get_job_meta(job_id)
+    if not job_meta or not job_meta.get("video_url"):
+        return Response(status_code=404)
+    if job_meta.get("user_id") != token_user_id:
+        return Response(status_code=403)
+
+    if STREAM_SIGNED_REDIRECT:
+        # Same answer as GET: the player follows the redirect for its metadata too
+        return await _signed_stream_redirect(job_meta)
+
+    size = job_meta.get("size_bytes")
+    if size is None:
+        # Jobs completed before size_bytes was recorded: one HEAD on Storage, then cached
+        try:
+            upstream = await get_http_client().head(
+                f"{SUPABASE_URL}/storage/v1/object/{VIDEOS_BUCKET}/{job_meta['object_path']}",
+                headers={"Authorization": f"Bearer {SUPABASE_SERVICE_KEY}"},
+                timeout=10,
+            )
+        except httpx.TimeoutException:
+            return Response(status_code=504)
+        if upstream.status_code >= 400 or "content-length" not in upstream.headers:
+            return Response(status_code=upstream.status_code if upstream.status_code >= 400 else 502)
+        size = int(upstream.headers["content-length"])
+        job_meta["size_bytes"] = size
+
+    return Response(headers={
+        "Content-Length": str(size),
+        "Content-Type": "video/mp4",
+        "Accept-Ranges": "bytes",
+        "Cache-Control": VIDEO_CACHE_CONTROL,
+    })
+
 @app.get("/api/videos/{job_id}/stream")
 async def stream_video(job_id: str, request: Request):
     """Stream vidéo pour lecture dans le player (Range + proxy, pas d'URL externe)."""
     try:
         # Require auth and ensure ownership
         token_user_id = await _get_authenticated_user_id(request)
-        job = get_supabase().table("video_jobs").select("video_url, user_id").eq("id", job_id).single().execute()
-        if not job.data:
-            raise HTTPException(status_code=404, detail="Video not found")
+        job_meta = await _get_job_meta(job_id)
+        if not job_meta:
+            return Response(content=_VIDEO_NOT_FOUND_BODY, status_code=404, media_type="application/json")
 
-        if job.data.get("user_id") != token_user_id:
+        if job_meta.get("user_id") != token_user_id:
             raise HTTPException(status_code=403, detail="Forbidden")
 
-        video_url = job.data.get("video_url")
-        if not video_url:
-            raise HTTPException(status_code=404, detail="Video URL not available")
+        if not job_meta.get("video_url"):
+            return Response(content=_VIDEO_URL_UNAVAILABLE_BODY, status_code=404, media_type="application/json")
+
+        object_path = job_meta["object_path"]
 
-        object_path = _extract_object_path_from_public_url(video_url, VIDEOS_BUCKET)
-        if not object_path:
-            object_path = video_url.rstrip("/").split("/")[-1]
+        if STREAM_SIGNED_REDIRECT:
+            # Storage serves the ranges itself
+            return await _signed_stream_redirect(job_meta)
 
         range_header = request.headers.get("range") or request.headers.get("Range")
-        return await _proxy_supabase_object_stream(object_path, range_header)
+        return await _proxy_supabase_object_stream(
+            object_path,
+            range_header,
+            request.headers.get("if-none-match"),
+            request.headers.get("if-modified-since"),
+        )
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Stream error: {e}")
+        logger.exception("❌ Stream error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/upload-image")
@@ -2419,51 +3105,59 @@ async def upload_image_to_supabase(request: Request, file: UploadFile = File(...
         # Require auth
         await _get_authenticated_user_id(request)
         # Vérifier le type de fichier
-        allowed_types = ["image/jpeg", "image/png", "image/webp"]
-        if file.content_type not in allowed_types:
+        if file.content_type not in ALLOWED_IMAGE_TYPES:
             raise HTTPException(
                 status_code=400, 
-                detail=f"Invalid file type. Allowed: {', '.join(allowed_types)}"
+                detail=f"Invalid file type. Allowed: {ALLOWED_IMAGE_TYPES_JOINED}"
             )
         
-        # Lire le contenu
-        contents = await file.read()
+        # Générer un nom unique (extension en liste blanche)
+        _, dot, file_ext = (file.filename or "").rpartition('.')
+        file_ext = file_ext.lower() if dot else 'jpg'
+        if file_ext not in ALLOWED_IMAGE_EXTENSIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid file extension. Allowed: {', '.join(sorted(ALLOWED_IMAGE_EXTENSIONS))}"
+            )
+        filename = f"{uuid.uuid4().hex}.{file_ext}"
         
-        # Vérifier la taille (max 10MB)
-        max_size = 10 * 1024 * 1024  # 10MB
-        if len(contents) > max_size:
+        # Taille déjà connue après le parsing multipart : refus immédiat
+        max_size = MAX_IMAGE_UPLOAD_SIZE
+        if file.size is not None and file.size > max_size:
             raise HTTPException(
-                status_code=400, 
+                status_code=413, 
                 detail=f"File too large. Max size: {max_size / 1024 / 1024}MB"
             )
         
-        # Générer un nom unique
-        import uuid
-        file_ext = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
-        filename = f"{uuid.uuid4()}.{file_ext}"
-        
-        print(f"📤 Uploading image to Supabase: {filename}")
+        # Starlette a déjà mis le fichier en spool et la taille est bornée ci-dessus (et par le
+        # middleware) : une seule lecture, sans recopie dans un second tampon
+        contents = await file.read()
+        if len(contents) > max_size:
+            raise HTTPException(
+                status_code=413, 
+                detail=f"File too large. Max size: {max_size / 1024 / 1024}MB"
+            )
         
-        # Upload vers Supabase Storage
-        from supabase import create_client
-        supabase_client = create_client(
-            os.getenv("SUPABASE_URL"),
-            os.getenv("SUPABASE_SERVICE_KEY")
-        )
+        logger.info("📤 Uploading image to Supabase: %s", filename)
         
-        supabase_client.storage.from_("video-images").upload(
+        # Upload vers Supabase Storage (client partagé, appel bloquant exécuté hors de l'event loop)
+        await asyncio.to_thread(
+            get_supabase().storage.from_("video-images").upload,
             filename,
             contents,
             {
                 "content-type": file.content_type,
-                "cache-control": "public, max-age=31536000"
+                # storage3 envoie "max-age={valeur}" : on ne passe que la durée
+                "cache-control": "31536000",
+                # Nom UUID : jamais d'objet existant, pas d'écrasement à vérifier
+                "x-upsert": "false",
             }
         )
         
-        # Générer l'URL publique
-        public_url = supabase_client.storage.from_("video-images").get_public_url(filename)
+        # Générer l'URL publique (format connu, construit localement)
+        public_url = f"{SUPABASE_URL}/storage/v1/object/public/video-images/{filename}"
         
-        print(f"✅ Image uploaded: {public_url}")
+        logger.info("✅ Image uploaded: %s", public_url)
         
         return {
             "url": public_url,
@@ -2473,10 +3167,18 @@ async def upload_image_to_supabase(request: Request, file: UploadFile = File(...
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Upload error: {e}")
+        logger.exception("❌ Upload error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8080))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
+        log_level="info",
+    )
@@ -7,6 +7,7 @@ Supports both PROFESSIONAL and CREATOR tier plans with monthly and yearly billin
 """
 
 import os
+import asyncio
 import stripe
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Request
@@ -23,6 +24,12 @@ stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 # Frontend URL
 FRONTEND_URL = os.getenv("FRONTEND_URL", "https://vykso.lovable.app")
 
+# Checkout redirect URLs (resolved once at import)
+SUBSCRIPTION_SUCCESS_URL = f"{FRONTEND_URL}/success?session_id={{CHECKOUT_SESSION_ID}}"
+CHECKOUT_SUCCESS_URL = f"{FRONTEND_URL}/payment-success?session_id={{CHECKOUT_SESSION_ID}}"
+CHECKOUT_CANCEL_PRICING_URL = f"{FRONTEND_URL}/pricing"
+CHECKOUT_CANCEL_CREDITS_URL = f"{FRONTEND_URL}/credits"
+
 
 class CheckoutRequest(BaseModel):
     """Request model for creating a checkout session"""
@@ -87,8 +94,8 @@ async def create_checkout_session(req: CheckoutRequest, request: Request):
                 "price": req.price_id,
                 "quantity": 1,
             }],
-            "success_url": f"{FRONTEND_URL}/success?session_id={{CHECKOUT_SESSION_ID}}",
-            "cancel_url": f"{FRONTEND_URL}/pricing",
+            "success_url": SUBSCRIPTION_SUCCESS_URL,
+            "cancel_url": CHECKOUT_CANCEL_PRICING_URL,
             "allow_promotion_codes": True,
             "metadata": {
                 "userId": req.user_id,
@@ -115,7 +122,7 @@ async def create_checkout_session(req: CheckoutRequest, request: Request):
             session_params["customer_email"] = req.user_email
         
         # Create the checkout session
-        session = stripe.checkout.Session.create(**session_params)
+        session = await asyncio.to_thread(stripe.checkout.Session.create, **session_params)
         
         print(f"✅ Checkout session created: {session.id}")
         print(f"   Plan: {plan_info['name']} ({plan_info['planFamily']})")
@@ -184,15 +191,16 @@ async def create_checkout_legacy(req: dict, request: Request):
     plan_name = config.get_plan_name_from_price_id(price_id)
     
     try:
-        session = stripe.checkout.Session.create(
+        session = await asyncio.to_thread(
+            stripe.checkout.Session.create,
             payment_method_types=['card'],
             line_items=[{
                 'price': price_id,
                 'quantity': 1,
             }],
             mode='subscription',
-            success_url=f"{FRONTEND_URL}/payment-success?session_id={{CHECKOUT_SESSION_ID}}",
-            cancel_url=f"{FRONTEND_URL}/pricing",
+            success_url=CHECKOUT_SUCCESS_URL,
+            cancel_url=CHECKOUT_CANCEL_PRICING_URL,
             allow_promotion_codes=True,
             client_reference_id=user_id,
             metadata={
@@ -236,7 +244,8 @@ async def buy_credits(req: BuyCreditsRequest, request: Request):
         raise HTTPException(status_code=400, detail="Invalid amount for selected credits pack")
     
     try:
-        session = stripe.checkout.Session.create(
+        session = await asyncio.to_thread(
+            stripe.checkout.Session.create,
             payment_method_types=['card'],
             line_items=[{
                 'price_data': {
@@ -250,8 +259,8 @@ async def buy_credits(req: BuyCreditsRequest, request: Request):
                 'quantity': 1,
             }],
             mode='payment',
-            success_url=f"{FRONTEND_URL}/payment-success?session_id={{CHECKOUT_SESSION_ID}}",
-            cancel_url=f"{FRONTEND_URL}/credits",
+            success_url=CHECKOUT_SUCCESS_URL,
+            cancel_url=CHECKOUT_CANCEL_CREDITS_URL,
             client_reference_id=req.user_id,
             metadata={
                 'user_id': req.user_id,
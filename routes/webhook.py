@@ -15,10 +15,12 @@ Events handled:
 """
 
 import os
+import asyncio
+import time
 import stripe
 from datetime import datetime
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Request
+from typing import Dict, Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
 
 from config.stripe_config import get_stripe_config, get_plan_type
 from services.supabase_service import (
@@ -36,9 +38,31 @@ router = APIRouter(tags=["webhook"])
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 
+# Recently processed event ids (monotonic timestamp), used to drop Stripe
+# redeliveries of the same event without touching the database again.
+_recent_events: Dict[str, float] = {}
+_DEDUP_WINDOW = 600.0
+_DEDUP_MAX_ENTRIES = 10000
+
+
+def _is_duplicate_event(event_id: str) -> bool:
+    """Return True if event_id was already seen within the dedup window, else record it."""
+    now = time.monotonic()
+    last = _recent_events.get(event_id)
+    if last is not None and now - last < _DEDUP_WINDOW:
+        return True
+    
+    if len(_recent_events) >= _DEDUP_MAX_ENTRIES:
+        cutoff = now - _DEDUP_WINDOW
+        for key in [k for k, seen in _recent_events.items() if seen < cutoff]:
+            del _recent_events[key]
+    
+    _recent_events[event_id] = now
+    return False
+
 
 @router.post("/api/webhooks/stripe")
-async def stripe_webhook(request: Request):
+async def stripe_webhook(request: Request, background_tasks: BackgroundTasks):
     """
     Main Stripe webhook handler.
     
@@ -56,7 +80,8 @@ async def stripe_webhook(request: Request):
     
     # Verify webhook signature
     try:
-        event = stripe.Webhook.construct_event(
+        event = await asyncio.to_thread(
+            stripe.Webhook.construct_event,
             payload, sig_header, STRIPE_WEBHOOK_SECRET
         )
     except ValueError as e:
@@ -72,9 +97,29 @@ async def stripe_webhook(request: Request):
     
     print(f"📨 [{timestamp}] Received Stripe webhook: {event_type} (ID: {event_id})")
     
+    if _is_duplicate_event(event_id):
+        print(f"ℹ️ Duplicate webhook ignored: {event_id}")
+        return {"status": "duplicate", "event_type": event_type}
+    
+    # Process after the response is sent: Stripe only needs a fast 200
+    background_tasks.add_task(process_stripe_event, event)
+    
+    return {"status": "received", "event_type": event_type}
+
+
+async def process_stripe_event(event: dict):
+    """
+    Log and dispatch a verified Stripe event to its handler.
+    
+    Runs as a background task; errors are logged and never re-raised
+    since the webhook has already been acknowledged.
+    """
+    event_type = event['type']
+    event_id = event['id']
+    
     # Log all events
     try:
-        log_webhook_event(event_type, event_id, event['data']['object'])
+        await asyncio.to_thread(log_webhook_event, event_type, event_id, event['data']['object'])
     except Exception as e:
         print(f"⚠️ Failed to log webhook event: {e}")
     
@@ -97,17 +142,11 @@ async def stripe_webhook(request: Request):
         
         else:
             print(f"ℹ️ Unhandled event type: {event_type}")
-        
-        # Always return 200 to prevent Stripe retries
-        return {"status": "success", "event_type": event_type}
     
     except Exception as e:
         print(f"❌ Error processing webhook {event_type}: {e}")
         import traceback
         traceback.print_exc()
-        # Still return 200 to prevent infinite retries
-        # Log the error for investigation
-        return {"status": "error", "event_type": event_type, "error": str(e)}
 
 
 async def handle_checkout_completed(session: dict):
@@ -137,7 +176,7 @@ async def handle_checkout_completed(session: dict):
         credits_to_add = int(metadata.get('credits', 0))
         print(f"💳 Credit purchase: {credits_to_add} credits for user {user_id}")
         
-        add_credits_to_user(user_id, credits_to_add)
+        await asyncio.to_thread(add_credits_to_user, user_id, credits_to_add)
         print(f"✅ Added {credits_to_add} credits to user {user_id}")
         return
     
@@ -147,7 +186,7 @@ async def handle_checkout_completed(session: dict):
         return
     
     # Fetch full subscription from Stripe
-    subscription = stripe.Subscription.retrieve(subscription_id)
+    subscription = await asyncio.to_thread(stripe.Subscription.retrieve, subscription_id)
     price_id = subscription['items']['data'][0]['price']['id']
     
     # Get plan info
@@ -175,7 +214,8 @@ async def handle_checkout_completed(session: dict):
     print(f"   Credits: {plan_info['credits']}")
     
     # Update user in Supabase
-    update_user_subscription(
+    await asyncio.to_thread(
+        update_user_subscription,
         user_id=user_id,
         data={
             'stripe_customer_id': customer_id,
@@ -208,7 +248,7 @@ async def handle_subscription_updated(subscription: dict):
     
     if not user_id:
         # Try to find user by subscription ID
-        user = get_user_by_stripe_subscription(subscription['id'])
+        user = await asyncio.to_thread(get_user_by_stripe_subscription, subscription['id'])
         if user:
             user_id = user.get('id')
     
@@ -252,7 +292,7 @@ async def handle_subscription_updated(subscription: dict):
     if status == 'active':
         update_data['credits'] = plan_info['credits']
     
-    update_user_subscription(user_id=user_id, data=update_data)
+    await asyncio.to_thread(update_user_subscription, user_id=user_id, data=update_data)
 
 
 async def handle_subscription_deleted(subscription: dict):
@@ -270,7 +310,7 @@ async def handle_subscription_deleted(subscription: dict):
     
     if not user_id:
         # Try to find user by subscription ID
-        user = get_user_by_stripe_subscription(subscription['id'])
+        user = await asyncio.to_thread(get_user_by_stripe_subscription, subscription['id'])
         if user:
             user_id = user.get('id')
     
@@ -283,7 +323,8 @@ async def handle_subscription_deleted(subscription: dict):
     print(f"🚫 Subscription canceled for user {user_id}")
     
     # Update user in Supabase
-    update_user_subscription(
+    await asyncio.to_thread(
+        update_user_subscription,
         user_id=user_id,
         data={
             'status': 'canceled',
@@ -313,7 +354,7 @@ async def handle_payment_succeeded(invoice: dict):
         return
     
     # Get user by subscription
-    user = get_user_by_stripe_subscription(subscription_id)
+    user = await asyncio.to_thread(get_user_by_stripe_subscription, subscription_id)
     if not user:
         print(f"⚠️ No user found for subscription {subscription_id}")
         return
@@ -329,7 +370,7 @@ async def handle_payment_succeeded(invoice: dict):
         credits = config.get_credits_for_plan(current_plan)
         if credits == 0:
             # Try to get from subscription
-            subscription = stripe.Subscription.retrieve(subscription_id)
+            subscription = await asyncio.to_thread(stripe.Subscription.retrieve, subscription_id)
             price_id = subscription['items']['data'][0]['price']['id']
             plan_info = get_plan_type(price_id)
             if plan_info:
@@ -337,7 +378,8 @@ async def handle_payment_succeeded(invoice: dict):
         
         if credits > 0:
             # Recharge credits
-            update_user_subscription(
+            await asyncio.to_thread(
+                update_user_subscription,
                 user_id=user_id,
                 data={'credits': credits}
             )
@@ -368,7 +410,7 @@ async def handle_payment_failed(invoice: dict):
         return
     
     # Get user by subscription
-    user = get_user_by_stripe_subscription(subscription_id)
+    user = await asyncio.to_thread(get_user_by_stripe_subscription, subscription_id)
     if not user:
         print(f"⚠️ No user found for subscription {subscription_id}")
         return
@@ -382,7 +424,8 @@ async def handle_payment_failed(invoice: dict):
     hosted_invoice_url = invoice.get('hosted_invoice_url')
     
     # Notify user
-    notify_payment_failed(
+    await asyncio.to_thread(
+        notify_payment_failed,
         user_id=user_id,
         email=user_email,
         invoice_url=hosted_invoice_url,
@@ -6,6 +6,9 @@ from .supabase_service import (
     notify_payment_failed,
     get_user_by_stripe_subscription,
     log_webhook_event,
+    get_cached_profile,
+    cache_profile,
+    invalidate_profile,
 )
 
 __all__ = [
@@ -15,4 +18,7 @@ __all__ = [
     'notify_payment_failed',
     'get_user_by_stripe_subscription',
     'log_webhook_event',
+    'get_cached_profile',
+    'cache_profile',
+    'invalidate_profile',
 ]
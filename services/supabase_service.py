@@ -11,13 +11,17 @@ Functions:
 - notifyPaymentFailed: Send payment failure notification
 - getUserByStripeSubscription: Find user by subscription ID
 - logWebhookEvent: Log webhook events for debugging
+- getCachedProfile / cacheProfile / invalidateProfile: In-process profile cache
 """
 
 import os
 import json
+import threading
 from datetime import datetime
 from typing import Optional, Dict, Any
-from supabase import create_client, Client
+from cachetools import TTLCache
+from supabase import Client
+from supabase_client import get_client
 
 
 # =============================================
@@ -37,17 +41,42 @@ def get_supabase_service() -> Client:
     global _supabase_client
     
     if _supabase_client is None:
-        url = os.getenv("SUPABASE_URL")
-        key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_SERVICE_KEY")
-        
-        if not url or not key:
-            raise ValueError("Missing Supabase credentials (SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY)")
-        
-        _supabase_client = create_client(url, key)
+        # Share the app-wide client so webhooks reuse the same pooled sessions
+        _supabase_client = get_client()
     
     return _supabase_client
 
 
+# =============================================
+# PROFILE CACHE
+# =============================================
+
+# Profile rows read by the API, keyed by user_id. Every profiles write made by
+# this process invalidates its entry; the TTL bounds staleness for writes made
+# elsewhere (other instances, SQL functions, dashboard edits).
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "60"))
+_profile_cache: TTLCache = TTLCache(maxsize=10_000, ttl=PROFILE_CACHE_TTL)
+_profile_cache_lock = threading.Lock()
+
+
+def get_cached_profile(user_id: str) -> Optional[Dict[str, Any]]:
+    """Return the cached profile row for user_id, or None on a miss."""
+    with _profile_cache_lock:
+        return _profile_cache.get(user_id)
+
+
+def cache_profile(user_id: str, profile: Dict[str, Any]):
+    """Store a full profile row for user_id."""
+    with _profile_cache_lock:
+        _profile_cache[user_id] = profile
+
+
+def invalidate_profile(user_id: str):
+    """Drop user_id's cached profile after a write to its row."""
+    with _profile_cache_lock:
+        _profile_cache.pop(user_id, None)
+
+
 # =============================================
 # SUBSCRIPTION MANAGEMENT
 # =============================================
@@ -103,6 +132,7 @@ def update_user_subscription(user_id: str, data: Dict[str, Any]) -> bool:
         
         # Update the profiles table
         result = supabase.table("profiles").update(update_data).eq("id", user_id).execute()
+        invalidate_profile(user_id)
         
         if result.data:
             print(f"✅ Updated subscription for user {user_id}")
@@ -146,6 +176,7 @@ def add_credits_to_user(user_id: str, credits: int) -> bool:
             "credits": new_credits,
             "updated_at": datetime.utcnow().isoformat()
         }).eq("id", user_id).execute()
+        invalidate_profile(user_id)
         
         if result.data:
             print(f"✅ Added {credits} credits to user {user_id} (total: {new_credits})")
@@ -193,6 +224,9 @@ def log_credit_transaction(user_id: str, amount: int, transaction_type: str, des
 # USER LOOKUP
 # =============================================
 
+# Columns the webhook handlers read from a looked-up user (never the youtube_tokens blob)
+USER_LOOKUP_COLUMNS = "id, email, plan"
+
 def get_user_by_stripe_subscription(subscription_id: str) -> Optional[Dict[str, Any]]:
     """
     Find a user by their Stripe subscription ID.
@@ -201,12 +235,12 @@ def get_user_by_stripe_subscription(subscription_id: str) -> Optional[Dict[str,
         subscription_id: The Stripe subscription ID
     
     Returns:
-        User data dictionary or None if not found
+        User data dictionary (USER_LOOKUP_COLUMNS) or None if not found
     """
     try:
         supabase = get_supabase_service()
         
-        result = supabase.table("profiles").select("*").eq(
+        result = supabase.table("profiles").select(USER_LOOKUP_COLUMNS).eq(
             "stripe_subscription_id", subscription_id
         ).single().execute()
         
@@ -225,12 +259,12 @@ def get_user_by_stripe_customer(customer_id: str) -> Optional[Dict[str, Any]]:
         customer_id: The Stripe customer ID
     
     Returns:
-        User data dictionary or None if not found
+        User data dictionary (USER_LOOKUP_COLUMNS) or None if not found
     """
     try:
         supabase = get_supabase_service()
         
-        result = supabase.table("profiles").select("*").eq(
+        result = supabase.table("profiles").select(USER_LOOKUP_COLUMNS).eq(
             "stripe_customer_id", customer_id
         ).single().execute()
         
@@ -1,25 +1,59 @@
 import os
+import httpx
+from functools import lru_cache
 from supabase import create_client, Client
-from typing import Optional
+from supabase.lib.client_options import ClientOptions
+
+# Timeout (seconds) for PostgREST calls made through the shared client
+POSTGREST_TIMEOUT = float(os.getenv("SUPABASE_POSTGREST_TIMEOUT", "10"))
+# Connection pool per sub-client (database, storage): every handler and worker thread
+# shares it, so it is sized above the httpx defaults (100 connections / 20 keep-alive)
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "120"))
+SUPABASE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", "80"))
+
+def _pooled_http_client(timeout: float) -> httpx.Client:
+    """Client HTTP dédié à un sous-client Supabase (base_url et headers sont posés par celui-ci)"""
+    return httpx.Client(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=30,
+        ),
+        follow_redirects=True,
+        http2=True,
+    )
 
 def get_supabase_client() -> Client:
     """
     Retourne un client Supabase configuré
     """
     url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_SERVICE_KEY")
     
     if not url or not key:
         raise ValueError("Missing Supabase credentials in environment variables")
     
-    return create_client(url, key)
-
-# Singleton instance
-_supabase_client: Optional[Client] = None
+    client = create_client(url, key, options=ClientOptions(postgrest_client_timeout=POSTGREST_TIMEOUT))
+    options = client.options  # copy carrying the auth headers
+    # ClientOptions.httpx_client would be shared by every sub-client, each one rewriting its
+    # base_url: give the database and storage clients their own pooled client instead.
+    # _init_postgrest_client/_init_storage_client are private (http_client= exists on 2.16.x):
+    # supabase is pinned to that minor in requirements.txt, bump both together
+    client._postgrest = client._init_postgrest_client(
+        rest_url=client.rest_url,
+        headers=options.headers,
+        schema=options.schema,
+        http_client=_pooled_http_client(POSTGREST_TIMEOUT),
+    )
+    client._storage = client._init_storage_client(
+        storage_url=client.storage_url,
+        headers=options.headers,
+        http_client=_pooled_http_client(options.storage_client_timeout),
+    )
+    return client
 
+@lru_cache(maxsize=1)
 def get_client() -> Client:
-    """Get or create Supabase client singleton"""
-    global _supabase_client
-    if _supabase_client is None:
-        _supabase_client = get_supabase_client()
-    return _supabase_client
+    """Get or create Supabase client singleton (built once per process)"""
+    return get_supabase_client()
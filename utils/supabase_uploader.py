@@ -1,15 +1,12 @@
-import os
-from supabase import create_client
 import httpx
+from supabase_client import get_client
 
 class SupabaseVideoUploader:
     """Upload vidéos vers Supabase Storage"""
     
     def __init__(self):
-        self.supabase = create_client(
-            os.getenv("SUPABASE_URL"),
-            os.getenv("SUPABASE_SERVICE_KEY")  # Service key pour bypass RLS
-        )
+        # Client partagé (service key pour bypass RLS) : sessions HTTP réutilisées
+        self.supabase = get_client()
         self.bucket = "vykso-videos"
     
     def upload_from_url(self, video_url: str, filename: str) -> str:
@@ -113,9 +110,6 @@ class SupabaseVideoUploader:
         """
         print(f"📤 Uploading file to Supabase Storage: {filename} -> {bucket}")
         
-        with open(file_path, "rb") as f:
-            file_data = f.read()
-        
         # Determine content type based on file extension
         if filename.endswith(".png"):
             content_type = "image/png"
@@ -128,14 +122,17 @@ class SupabaseVideoUploader:
         else:
             content_type = "application/octet-stream"
         
-        self.supabase.storage.from_(bucket).upload(
-            filename,
-            file_data,
-            {
-                "content-type": content_type,
-                "cache-control": "public, max-age=31536000",
-            },
-        )
+        # The open handle is streamed from disk into the multipart body (never read into memory).
+        # storage3 renders cache-control as "max-age={value}": pass the bare number of seconds
+        with open(file_path, "rb") as f:
+            self.supabase.storage.from_(bucket).upload(
+                filename,
+                f,
+                {
+                    "content-type": content_type,
+                    "cache-control": "31536000",
+                },
+            )
         
         public_url = self.supabase.storage.from_(bucket).get_public_url(filename)
         print(f"✅ File uploaded successfully: {public_url}")
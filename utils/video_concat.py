@@ -4,6 +4,7 @@ import tempfile
 import httpx
 from typing import List, Optional, Union
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 
 
 class VideoEditor:
@@ -219,19 +220,40 @@ class VideoEditor:
             Bytes de la vidéo concaténée
         """
         with tempfile.TemporaryDirectory() as tmpdir:
-            print(f"🎞️ Starting concatenation of {len(video_urls)} videos...")
-            if add_transitions:
-                print(f"✨ Transitions enabled: {transition_duration}s crossfade")
-            
-            # 1. Download toutes les vidéos
-            video_files = []
-            for i, url in enumerate(video_urls):
-                video_path = os.path.join(tmpdir, f"clip_{i:02d}.mp4")
-                VideoEditor.download_video(url, video_path)
-                video_files.append(video_path)
+            # 1. Download toutes les vidéos (en parallèle)
+            video_files = [os.path.join(tmpdir, f"clip_{i:02d}.mp4") for i in range(len(video_urls))]
+            with ThreadPoolExecutor(max_workers=min(8, max(1, len(video_urls)))) as pool:
+                list(pool.map(VideoEditor.download_video, video_urls, video_files))
             
             print(f"✅ All {len(video_files)} clips downloaded successfully")
             
+            return VideoEditor.concatenate_files(video_files, output_filename, add_transitions, transition_duration)
+    
+    @staticmethod
+    def concatenate_files(
+        video_files: List[str], 
+        output_filename: str,
+        add_transitions: bool = False,
+        transition_duration: float = 0.3
+    ) -> bytes:
+        """
+        Concatène des vidéos locales (chemins) en une seule, optionnellement avec des transitions crossfade.
+        Sans transitions, ffmpeg copie les flux (concat demuxer, pas de ré-encodage).
+        
+        Args:
+            video_files: Chemins locaux des vidéos à concaténer
+            output_filename: Nom du fichier de sortie
+            add_transitions: Si True, ajoute des crossfades entre les clips
+            transition_duration: Durée du crossfade en secondes (0.3-0.5 recommandé)
+        
+        Returns:
+            Bytes de la vidéo concaténée
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            print(f"🎞️ Starting concatenation of {len(video_files)} videos...")
+            if add_transitions:
+                print(f"✨ Transitions enabled: {transition_duration}s crossfade")
+            
             output_path = os.path.join(tmpdir, output_filename)
             
             if add_transitions and len(video_files) > 1:
@@ -350,7 +372,7 @@ class VideoEditor:
                 # Fallback to simple concat if transitions fail
                 if add_transitions:
                     print("⚠️ Falling back to simple concat without transitions...")
-                    return VideoEditor.concatenate_videos(video_urls, output_filename, add_transitions=False)
+                    return VideoEditor.concatenate_files(video_files, output_filename, add_transitions=False)
                 
                 raise Exception(f"Video concatenation failed: {error_msg}")
             